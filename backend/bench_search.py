@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Contact search benchmark against a real MongoDB.
+
+Seeds a throwaway database with ``--docs`` contact submissions (100k by
+default), creates the app's indexes, then times ``search_contacts`` for
+narrow, broad and filtered queries, first and second page. Each query's plan
+is checked with ``explain``: it must be served by the ``contact_text`` index.
+mongomock has no ``$text``, so this needs MONGO_URL to point at a mongod.
+
+    python bench_search.py [--docs 100000] [--repeat 20] [--budget-ms 50] [--json]
+
+Exits non-zero when a query's p95 exceeds the budget or its plan does not
+use the text index. The database is dropped afterwards unless --keep-db.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = f"bench_search_{uuid.uuid4().hex[:8]}"
+os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000")
+
+import server
+
+COMMON = ["project", "website", "hello", "question", "pricing", "design", "support", "meeting"]
+RARE = ["kubernetes", "terraform", "blockchain", "accessibility", "localization", "firmware"]
+
+# (label, q, read filter, page)
+QUERIES = [
+    ("narrow", "kubernetes", None, 1),
+    ("broad", "project", None, 1),
+    ("broad page 2", "project", None, 2),
+    ("two terms", "pricing design", None, 1),
+    ("broad unread", "website", False, 1),
+    ("email", "visitor4242@example.com", None, 1),
+]
+
+
+def make_contact(i, now):
+    words = random.choices(COMMON, k=6) + ([random.choice(RARE)] if i % 200 == 0 else [])
+    random.shuffle(words)
+    return {
+        "id": str(uuid.uuid4()),
+        "name": f"Visitor {i}",
+        "email": f"visitor{i}@example.com",
+        "phone": None,
+        "subject": " ".join(words[:2]),
+        "message": " ".join(words),
+        "created_at": now - timedelta(seconds=i),
+        "read": i % 3 == 0,
+    }
+
+
+async def seed(database, docs):
+    now = datetime.now(timezone.utc)
+    for start in range(0, docs, 5000):
+        await database.contact_submissions.insert_many(
+            [make_contact(i, now) for i in range(start, min(start + 5000, docs))], ordered=False
+        )
+    await server.ensure_indexes(database)
+
+
+def plan_indexes(plan):
+    """Index names anywhere in an explain plan tree."""
+    names = set()
+    if isinstance(plan, dict):
+        if plan.get("indexName"):
+            names.add(plan["indexName"])
+        for value in plan.values():
+            names |= plan_indexes(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            names |= plan_indexes(value)
+    return names
+
+
+async def explain(database, q, read):
+    query = {"$text": {"$search": q}}
+    if read is not None:
+        query["read"] = read
+    cursor = database.contact_submissions.find(query, {"_id": 0, "score": {"$meta": "textScore"}}) \
+        .sort([("score", {"$meta": "textScore"}), ("created_at", -1)]).limit(server.PAGE_SIZE_DEFAULT + 1)
+    result = await cursor.explain()
+    stats = result.get("executionStats", {})
+    return {
+        "indexes": sorted(plan_indexes(result.get("queryPlanner", {}).get("winningPlan", {}))),
+        "docs_examined": stats.get("totalDocsExamined"),
+    }
+
+
+async def time_query(q, read, page, repeat):
+    cursor = None
+    if page > 1:
+        _, cursor, _ = await server.search_contacts(q, server.PAGE_SIZE_DEFAULT, None, read)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        docs, _, total = await server.search_contacts(q, server.PAGE_SIZE_DEFAULT, cursor, read)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "rows": len(docs),
+        "total": total,
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(int(0.95 * len(timings)), len(timings) - 1)], 2),
+    }
+
+
+async def run(args):
+    from pymongo.errors import ServerSelectionTimeoutError
+    database = server.init_mongo()
+    try:
+        await database.command("ping")
+    except ServerSelectionTimeoutError:
+        server.close_mongo()
+        raise SystemExit(f"MongoDB at {os.environ['MONGO_URL']} is unreachable; this benchmark needs a mongod")
+    try:
+        print(f"seeding {args.docs} contacts into {database.name}", file=sys.stderr)
+        await seed(database, args.docs)
+        results = []
+        for label, q, read, page in QUERIES:
+            row = {"query": label, "q": q, "read": read, "page": page}
+            row.update(await time_query(q, read, page, args.repeat))
+            row.update(await explain(database, q, read))
+            row["ok"] = row["p95_ms"] <= args.budget_ms and "contact_text" in row["indexes"]
+            results.append(row)
+        return results
+    finally:
+        if not args.keep_db:
+            await server.client.drop_database(database.name)
+        server.close_mongo()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="p95 budget per query")
+    parser.add_argument("--keep-db", action="store_true", help="Do not drop the seeded database")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    random.seed(42)
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['query']:<14} p50 {r['p50_ms']:>7}ms  p95 {r['p95_ms']:>7}ms  rows {r['rows']:>3}"
+                  f"  total {r['total']}  examined {r['docs_examined']}  indexes {','.join(r['indexes'])}"
+                  f"  {'ok' if r['ok'] else 'FAIL'}")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for list-route serialization.
+
+Compares the validated path (response_model=List[Model] -> jsonable_encoder ->
+JSONResponse) with the fast path (model_construct -> FastJSONResponse) for
+trusted documents, reporting per-row cost at 1k and 10k rows.
+
+    python bench_serialization.py [--rows 1000 10000] [--repeat 5] [--json]
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "bench")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import server
+
+
+def make_contacts(n):
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": str(uuid.uuid4()),
+        "name": f"Visitor {i}",
+        "email": f"visitor{i}@example.com",
+        "phone": None,
+        "subject": "Project inquiry",
+        "message": "Hello, I would like to discuss a product roadmap engagement. " * 3,
+        "created_at": now - timedelta(minutes=i),
+        "read": i % 3 == 0,
+    } for i in range(n)]
+
+
+def make_status_checks(n):
+    now = datetime.now(timezone.utc)
+    return [{"id": str(uuid.uuid4()), "client_name": f"probe-{i % 7}", "timestamp": now - timedelta(seconds=i)}
+            for i in range(n)]
+
+
+def validated_path(model_cls, docs):
+    adapter = TypeAdapter(List[model_cls])
+    return JSONResponse(jsonable_encoder(adapter.validate_python(docs))).body
+
+
+def fast_path(model_cls, docs):
+    return server.FastJSONResponse(server.construct_trusted(model_cls, docs)).body
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(rows, repeat):
+    results = []
+    for label, model_cls, factory in (
+        ("ContactSubmission", server.ContactSubmission, make_contacts),
+        ("StatusCheck", server.StatusCheck, make_status_checks),
+    ):
+        for n in rows:
+            docs = factory(n)
+            slow = best_of(lambda: validated_path(model_cls, docs), repeat)
+            fast = best_of(lambda: fast_path(model_cls, docs), repeat)
+            results.append({
+                "model": label,
+                "rows": n,
+                "validated_us_per_row": round(slow / n * 1e6, 3),
+                "fast_us_per_row": round(fast / n * 1e6, 3),
+                "speedup": round(slow / fast, 2) if fast else None,
+                "orjson": server.orjson is not None,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            print(f"{r['model']:<18} {r['rows']:>6} rows  validated {r['validated_us_per_row']:>8} us/row"
+                  f"  fast {r['fast_us_per_row']:>8} us/row  x{r['speedup']}")
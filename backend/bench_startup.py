@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for server.py.
+
+Imports the module in fresh interpreters (as a new worker would), reports the
+median import time, and lists the slowest modules ``server`` pulls in, from
+``python -X importtime``. Optionally also times the lifespan startup, which
+needs a reachable MongoDB.
+
+Import time is dominated by fastapi and motor, and it varies by host, so
+there is no fixed default budget. Record a baseline on the machine that runs
+the check, then compare later runs against it:
+
+    python bench_startup.py --save-baseline startup.json
+    python bench_startup.py --baseline startup.json [--tolerance 0.15]
+    python bench_startup.py --budget-ms 750 [--runs 5] [--lifespan] [--json]
+
+Exits non-zero when the median import time exceeds the budget, if one is set.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+
+LIFESPAN_SNIPPET = """
+import asyncio, time
+import server
+
+async def main():
+    t = time.perf_counter()
+    async with server.app.router.lifespan_context(server.app):
+        print(time.perf_counter() - t)
+
+asyncio.run(main())
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "bench_startup")
+    return env
+
+
+def run_snippet(snippet, extra_args=()):
+    result = subprocess.run(
+        [sys.executable, *extra_args, "-c", snippet],
+        cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True, check=True,
+    )
+    return result
+
+
+def slowest_imports(limit):
+    """The ``limit`` modules under ``server`` with the largest cumulative import times.
+
+    ``-X importtime`` prints a module after everything it imports, indented
+    two spaces per level, so ``server``'s subtree is every row between the
+    previous top-level row and ``server`` itself.
+    """
+    stderr = run_snippet("import server", ("-X", "importtime")).stderr
+    subtree = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 0:
+            if name.strip() == "server":
+                break
+            subtree = []
+            continue
+        subtree.append({"module": name.strip(), "level": level, "cumulative_ms": round(int(fields[1]) / 1000, 1)})
+    return sorted(subtree, key=lambda row: -row["cumulative_ms"])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.environ["IMPORT_BUDGET_MS"]) if os.environ.get("IMPORT_BUDGET_MS") else None)
+    parser.add_argument("--baseline", help="JSON from --save-baseline; the budget becomes its median plus --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed growth over --baseline (0.15 = 15%%)")
+    parser.add_argument("--save-baseline", help="Write this run's report as a baseline")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list")
+    parser.add_argument("--lifespan", action="store_true", help="Also time lifespan startup (needs MongoDB)")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        args.budget_ms = round(baseline["import_median_ms"] * (1 + args.tolerance), 1)
+
+    import_ms = [float(run_snippet(IMPORT_SNIPPET).stdout.strip()) * 1000 for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "import_median_ms": round(statistics.median(import_ms), 1),
+        "import_max_ms": round(max(import_ms), 1),
+        "budget_ms": args.budget_ms,
+        "slowest_imports": slowest_imports(args.top),
+    }
+    if args.lifespan:
+        lifespan_ms = [float(run_snippet(LIFESPAN_SNIPPET).stdout.strip().splitlines()[-1]) * 1000
+                       for _ in range(args.runs)]
+        report["lifespan_median_ms"] = round(statistics.median(lifespan_ms), 1)
+    report["within_budget"] = None if args.budget_ms is None else report["import_median_ms"] <= args.budget_ms
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, indent=2))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        budget = f"budget {args.budget_ms}ms" if args.budget_ms is not None else "no budget"
+        print(f"import median {report['import_median_ms']}ms (max {report['import_max_ms']}ms, {budget})")
+        if "lifespan_median_ms" in report:
+            print(f"lifespan startup median {report['lifespan_median_ms']}ms")
+        for row in report["slowest_imports"]:
+            print(f"  {row['cumulative_ms']:>8}ms  {'  ' * (row['level'] - 1)}{row['module']}")
+    return 1 if report["within_budget"] is False else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the portfolio API.
+
+Run from the backend directory, e.g.:
+    python manage.py indexes report
+    python manage.py indexes ensure
+    python manage.py migrate datetimes
+    python manage.py bcrypt calibrate --target-ms 250
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+import server
+
+
+def run_with_db(fn, **kwargs):
+    """Run ``fn(database, **kwargs)`` with a Motor client scoped to the call."""
+    async def main():
+        database = server.init_mongo()
+        try:
+            return await fn(database, **kwargs)
+        finally:
+            server.close_mongo()
+    return asyncio.run(main())
+
+
+def cmd_indexes_report(args):
+    report = server.index_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for row in report:
+        status = "ok " if row["served"] else "MISSING"
+        print(f"{status} {row['route']:<24} {row['collection']}.{row['op']}"
+              f"({json.dumps(row['filter'])}) -> {row['index']}")
+    return 0 if all(row["served"] for row in report) else 1
+
+
+def cmd_indexes_ensure(args):
+    try:
+        created = run_with_db(server.ensure_indexes)
+    except RuntimeError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for name in created:
+        print(f"ensured {name}")
+    return 0 if len(created) == len(server.INDEX_SPECS) else 1
+
+
+def cmd_migrate_datetimes(args):
+    converted = run_with_db(
+        server.migrate_datetime_fields, batch_size=args.batch_size, collections=args.collection or None,
+    )
+    for name, count in converted.items():
+        print(f"{name}: converted {count} documents")
+    return 0
+
+
+def cmd_bcrypt_calibrate(args):
+    result = server.calibrate_bcrypt_rounds(
+        args.target_ms, min_rounds=args.min_rounds, max_rounds=args.max_rounds, samples=args.samples,
+    )
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for rounds, ms in result["verify_ms"].items():
+            print(f"rounds={rounds:<3} verify {ms:>8.2f} ms")
+        if not result["within_target"]:
+            print(f"warning: even {args.min_rounds} rounds exceeds {args.target_ms} ms", file=sys.stderr)
+        print(f"BCRYPT_ROUNDS={result['rounds']}")
+    return 0 if result["within_target"] else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    indexes = commands.add_parser("indexes", help="Inspect or create MongoDB indexes")
+    index_commands = indexes.add_subparsers(dest="action", required=True)
+    report = index_commands.add_parser("report", help="List query shapes and the index serving each")
+    report.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    report.set_defaults(func=cmd_indexes_report)
+    ensure = index_commands.add_parser("ensure", help="Create all indexes (idempotent)")
+    ensure.set_defaults(func=cmd_indexes_ensure)
+
+    migrate = commands.add_parser("migrate", help="Run data migrations")
+    migrations = migrate.add_subparsers(dest="migration", required=True)
+    datetimes = migrations.add_parser("datetimes", help="Convert ISO string timestamps to native datetimes")
+    datetimes.add_argument("--batch-size", type=int, default=500)
+    datetimes.add_argument("--collection", action="append", choices=sorted(server.DATETIME_FIELDS),
+                           help="Limit to a collection (repeatable)")
+    datetimes.set_defaults(func=cmd_migrate_datetimes)
+
+    bcrypt = commands.add_parser("bcrypt", help="Password hashing settings")
+    bcrypt_commands = bcrypt.add_subparsers(dest="action", required=True)
+    calibrate = bcrypt_commands.add_parser("calibrate", help="Pick the cost factor meeting a verify latency target")
+    calibrate.add_argument("--target-ms", type=float, default=250.0, help="Median verify time to stay within")
+    calibrate.add_argument("--min-rounds", type=int, default=10)
+    calibrate.add_argument("--max-rounds", type=int, default=16)
+    calibrate.add_argument("--samples", type=int, default=3, help="Verifications timed per cost factor")
+    calibrate.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    calibrate.set_defaults(func=cmd_bcrypt_calibrate)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    sys.exit(args.func(args))
@@ -1,32 +1,519 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Response, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Response, Request, Depends, Query, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne, UpdateMany, DeleteOne, DeleteMany, ReturnDocument, monitoring
+from pymongo import read_preferences
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import List, Optional, Literal, TYPE_CHECKING
 import uuid
 from datetime import datetime, timezone, timedelta
-from passlib.context import CryptContext
-import httpx
 import secrets
+import hashlib
+import base64
+import json
+import csv
+import io
+import time
+import asyncio
+import threading
+import contextvars
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+if TYPE_CHECKING:
+    import httpx  # imported lazily at runtime; see get_auth_http_client
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# ============== Metrics ==============
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labelnames, values) -> str:
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+class Counter:
+    """Prometheus-style counter. Thread-safe: Mongo events arrive off-loop."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, labels=(), value: float = 0.0) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, labels=(), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+class Histogram:
+    """Prometheus-style histogram with cumulative buckets."""
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(names, labels + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status.", ("method", "route", "status"))
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+mongo_command_duration = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and operation.", ("collection", "command"))
+mongo_command_failures = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by collection and operation.", ("collection", "command"))
+http_request_db_round_trips = Histogram(
+    "http_request_db_round_trips", "MongoDB commands issued while serving a request, by route template.",
+    ("method", "route"), buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21))
+
+def command_collection(event) -> str:
+    """Collection targeted by a started command, or "" for admin commands."""
+    target = event.command.get(event.command_name)
+    if event.command_name == "getMore":
+        target = event.command.get("collection")
+    return target if isinstance(target, str) else ""
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Feeds per-collection command latency from pymongo command monitoring."""
+
+    def __init__(self):
+        self._collections: dict = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = command_collection(event)
+        scope = current_request_scope.get()
+        if scope is not None and event.command_name not in QueryProfiler.IGNORED_COMMANDS:
+            # Per-request round trips, observed by MetricsMiddleware
+            scope["db_round_trips"] = scope.get("db_round_trips", 0) + 1
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            return self._collections.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        mongo_command_duration.observe((collection, event.command_name), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        mongo_command_duration.observe((collection, event.command_name), event.duration_micros / 1e6)
+        mongo_command_failures.inc((collection, event.command_name))
+
+# ============== Query Profiler ==============
+
+# ASGI scope of the request being served. The router fills in ``route`` on the
+# same dict before the endpoint runs, and Motor copies the context into its
+# executor threads, so command listeners can attribute commands to routes.
+current_request_scope: contextvars.ContextVar = contextvars.ContextVar("current_request_scope", default=None)
+
+def current_route() -> str:
+    scope = current_request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return f"{scope.get('method', '')} {getattr(route, 'path', scope.get('path', ''))}".strip()
+
+def query_shape(value):
+    """Replace literal values with "?" while keeping field names and operators."""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        if all(not isinstance(item, (dict, list)) for item in shapes):
+            return ["?"] if shapes else []
+        return shapes
+    return "?"
+
+def command_filter(event):
+    """Filter (or pipeline) of a started command, where it has one."""
+    command = event.command
+    name = event.command_name
+    if name in ("find", "count", "distinct"):
+        return command.get("filter", command.get("query", {}))
+    if name in ("update", "delete"):
+        key = "updates" if name == "update" else "deletes"
+        statements = command.get(key) or [{}]
+        return statements[0].get("q", {})
+    if name == "findAndModify":
+        return command.get("query", {})
+    if name == "aggregate":
+        return [{stage: query_shape(spec) if stage == "$match" else "?" for stage, spec in step.items()}
+                for step in command.get("pipeline", [])]
+    return None
+
+class QueryProfiler(monitoring.CommandListener):
+    """Opt-in slow-query log and per-shape command statistics.
+
+    Commands slower than ``slow_threshold_ms`` are logged with their route.
+    At most ``max_shapes`` distinct shapes are tracked; further new shapes
+    are counted as dropped.
+    """
+
+    IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "saslStart", "saslContinue"}
+
+    def __init__(self, slow_threshold_ms: float, max_shapes: int = 1000):
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_shapes = max_shapes
+        self._pending: dict = {}
+        self._shapes: dict = {}
+        self._lock = threading.Lock()
+        self.slow_commands = 0
+        self.dropped_shapes = 0
+
+    def started(self, event):
+        if event.command_name in self.IGNORED_COMMANDS:
+            return
+        shape = command_filter(event)
+        shape = json.dumps(query_shape(shape) if isinstance(shape, dict) else shape, sort_keys=True, default=str)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                command_collection(event), shape, current_route(),
+            )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        collection, shape, route = pending
+        duration_ms = event.duration_micros / 1000
+        key = (collection, event.command_name, shape)
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= self.max_shapes:
+                    self.dropped_shapes += 1
+                    entry = None
+                else:
+                    entry = self._shapes[key] = {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": {}}
+            if entry is not None:
+                entry["count"] += 1
+                entry["failures"] += int(failed)
+                entry["total_ms"] += duration_ms
+                entry["max_ms"] = max(entry["max_ms"], duration_ms)
+                entry["routes"][route] = entry["routes"].get(route, 0) + 1
+        if duration_ms >= self.slow_threshold_ms:
+            self.slow_commands += 1
+            logger.warning(
+                f"Slow query {duration_ms:.1f}ms {collection}.{event.command_name} {shape} route={route}"
+            )
+
+    def top(self, limit: int = 20, sort: str = "total_ms") -> List[dict]:
+        with self._lock:
+            rows = [
+                {
+                    "collection": collection,
+                    "command": command,
+                    "shape": json.loads(shape),
+                    "count": entry["count"],
+                    "failures": entry["failures"],
+                    "total_ms": round(entry["total_ms"], 2),
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 3),
+                    "max_ms": round(entry["max_ms"], 2),
+                    "routes": dict(sorted(entry["routes"].items(), key=lambda kv: -kv[1])[:5]),
+                }
+                for (collection, command, shape), entry in self._shapes.items()
+            ]
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self.slow_commands = 0
+            self.dropped_shapes = 0
+
+QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER', '').lower() in ('1', 'true', 'yes')
+query_profiler = QueryProfiler(
+    slow_threshold_ms=float(os.environ.get('SLOW_QUERY_MS', '100')),
+    max_shapes=int(os.environ.get('QUERY_PROFILER_MAX_SHAPES', '1000')),
+) if QUERY_PROFILER_ENABLED else None
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request counts and latency.
+
+    Routes are labelled by their template (``/api/admin/contacts/{contact_id}``)
+    so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc((method,))
+        scope_token = current_request_scope.set(scope)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_scope.reset(scope_token)
+            http_requests_in_flight.dec((method,))
+            route = scope.get("route")
+            labels = (method, getattr(route, "path", "unmatched"), str(status["code"]))
+            http_requests_total.inc(labels)
+            http_request_duration.observe(labels, time.perf_counter() - started)
+            http_request_db_round_trips.observe(labels[:2], scope.get("db_round_trips", 0))
+
+mongo_pool_wait = Histogram(
+    "mongodb_pool_wait_seconds", "Time spent waiting to check a connection out of the pool.", ("address",))
+mongo_pool_checkout_failures = Counter(
+    "mongodb_pool_checkout_failures_total", "Failed connection checkouts by reason.", ("address", "reason"))
+mongo_pool_checked_out = Gauge(
+    "mongodb_pool_connections_checked_out", "Connections currently checked out of the pool.", ("address",))
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Measures pool checkout wait time.
+
+    Check-out start and completion are reported on the same thread, so the
+    start time is kept in a thread-local.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _waited(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        mongo_pool_wait.observe((address,), self._waited())
+        mongo_pool_checked_out.inc((address,))
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        mongo_pool_wait.observe((address,), self._waited())
+        mongo_pool_checkout_failures.inc((address, str(event.reason)))
+
+    def connection_checked_in(self, event):
+        mongo_pool_checked_out.dec((self._address(event),))
+
+    def pool_created(self, event):
+        pass
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+mongo_command_metrics = MongoCommandMetrics()
+mongo_pool_metrics = MongoPoolMetrics()
+
+# MongoDB connection. Created per worker by the lifespan handler (or
+# init_mongo() in scripts) so forked workers never share a client.
+mongo_event_listeners = [mongo_command_metrics, mongo_pool_metrics] + ([query_profiler] if query_profiler else [])
+client: Optional[AsyncIOMotorClient] = None
+db = None
+# Heavy admin/reporting reads. Same database as ``db`` but routed by
+# REPORTING_READ_PREFERENCE, so they can be served by secondaries while auth
+# and session lookups stay on the primary.
+reporting_db = None
+
+def mongo_client_options() -> dict:
+    """Driver pool and transport settings from the environment."""
+    options = {
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        "maxIdleTimeMS": int(os.environ['MONGO_MAX_IDLE_TIME_MS']) if os.environ.get('MONGO_MAX_IDLE_TIME_MS') else None,
+        "waitQueueTimeoutMS": int(os.environ['MONGO_WAIT_QUEUE_TIMEOUT_MS']) if os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS') else None,
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '30000')),
+        "compressors": os.environ.get('MONGO_COMPRESSORS') or None,
+    }
+    return {key: value for key, value in options.items() if value is not None}
+
+def reporting_read_preference():
+    mode = os.environ.get('REPORTING_READ_PREFERENCE', 'primary')
+    max_staleness = int(os.environ.get('REPORTING_MAX_STALENESS_SECONDS', '-1'))
+    modes = {
+        "primary": read_preferences.Primary,
+        "primaryPreferred": read_preferences.PrimaryPreferred,
+        "secondary": read_preferences.Secondary,
+        "secondaryPreferred": read_preferences.SecondaryPreferred,
+        "nearest": read_preferences.Nearest,
+    }
+    if mode not in modes:
+        raise ValueError(f"Unknown REPORTING_READ_PREFERENCE: {mode}")
+    if mode == "primary":
+        return read_preferences.Primary()
+    return modes[mode](max_staleness=max_staleness)
+
+def init_mongo():
+    """Create this worker's Motor client if needed and return the database."""
+    global client, db, reporting_db
+    if client is None:
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'], tz_aware=True, event_listeners=mongo_event_listeners, **mongo_client_options()
+        )
+        db = client[os.environ['DB_NAME']]
+        reporting_db = client.get_database(os.environ['DB_NAME'], read_preference=reporting_read_preference())
+    return db
+
+def close_mongo() -> None:
+    global client, db, reporting_db
+    if client is not None:
+        client.close()
+        client = None
+        db = None
+        reporting_db = None
+
+# Password hashing. passlib is imported on first use to keep worker spawn fast.
+# BCRYPT_ROUNDS comes from `manage.py bcrypt calibrate`; unset keeps passlib's default.
+BCRYPT_ROUNDS = os.environ.get('BCRYPT_ROUNDS')
+_pwd_context = None
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        settings = {}
+        if BCRYPT_ROUNDS:
+            rounds = int(BCRYPT_ROUNDS)
+            # min_rounds makes needs_update() flag cheaper hashes so login rehashes them
+            settings = {"bcrypt__default_rounds": rounds, "bcrypt__min_rounds": rounds}
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", **settings)
+    return _pwd_context
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create per-worker resources on startup and release them on shutdown."""
+    init_mongo()
+    get_auth_http_client()
+    await ensure_indexes()
+    expiry_sweeper.start()
+    change_versions.start()
+    contact_feed.start()
+    session_cache.start()
+    session_revocations.start()
+    session_activity.start()
+    for buffer in write_behind_buffers:
+        buffer.start()
+    try:
+        yield
+    finally:
+        await expiry_sweeper.stop()
+        await change_versions.stop()
+        await contact_feed.stop()
+        await session_cache.stop()
+        await session_revocations.stop()
+        await session_activity.stop()
+        for buffer in write_behind_buffers:
+            await buffer.stop()
+        await close_auth_http_client()
+        close_mongo()
+        hashing_pool.shutdown()
 
 # Create the main app
-app = FastAPI(title="Kumar Abhinav Portfolio API")
+app = FastAPI(title="Kumar Abhinav Portfolio API", lifespan=lifespan)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -134,15 +621,1746 @@ class UpdatePreferencesRequest(BaseModel):
 class UpdateContactStatusRequest(BaseModel):
     read: bool
 
+BULK_MAX_IDS = int(os.environ.get('BULK_MAX_IDS', '1000'))
+
+class BulkContactFilter(BaseModel):
+    read: Optional[bool] = None
+    before: Optional[datetime] = None
+
+class BulkContactRequest(BaseModel):
+    action: Literal["mark_read", "mark_unread", "delete"]
+    ids: Optional[List[str]] = Field(default=None, max_length=BULK_MAX_IDS)
+    filter: Optional[BulkContactFilter] = None
+
+class BulkUserRoleRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=BULK_MAX_IDS)
+    role: Literal["admin", "visitor"]
+
+# ============== Datetime Storage ==============
+
+# Timestamps are stored as native BSON datetimes. Older documents hold ISO
+# strings until migrate_datetime_fields() has converted them, so reads accept
+# both forms.
+DATETIME_FIELDS = {
+    "users": ["created_at", "updated_at"],
+    "user_sessions": ["expires_at", "created_at"],
+    "password_reset_tokens": ["expires_at", "created_at"],
+    "contact_submissions": ["created_at"],
+    "status_checks": ["timestamp"],
+}
+
+def parse_datetime(value):
+    """Return a timezone-aware datetime for a stored datetime or ISO string."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def normalize_datetimes(doc: dict, *fields: str) -> dict:
+    for field in fields:
+        if field in doc:
+            doc[field] = parse_datetime(doc[field])
+    return doc
+
+async def migrate_datetime_fields(database=None, batch_size: int = 500, collections=None) -> dict:
+    """Convert ISO string timestamps to native datetimes in place.
+
+    Works in ``_id`` order in batches of ``batch_size`` and records the last
+    converted ``_id`` per collection in ``migrations``, so an interrupted run
+    resumes where it stopped. Safe to run while the app is serving traffic.
+    """
+    database = database if database is not None else db
+    converted = {}
+    for name in collections or DATETIME_FIELDS:
+        fields = DATETIME_FIELDS[name]
+        state_id = f"datetime_fields:{name}"
+        state = await database.migrations.find_one({"_id": state_id}) or {}
+        last_id = state.get("last_id")
+        converted[name] = 0
+        string_filter = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        while True:
+            query = dict(string_filter)
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            batch = await database[name].find(query, {field: 1 for field in fields}) \
+                .sort("_id", 1).limit(batch_size).to_list(batch_size)
+            if not batch:
+                break
+            ops = []
+            for doc in batch:
+                updates = {f: parse_datetime(doc[f]) for f in fields if isinstance(doc.get(f), str)}
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+            await database[name].bulk_write(ops, ordered=False)
+            converted[name] += len(ops)
+            last_id = batch[-1]["_id"]
+            await database.migrations.update_one(
+                {"_id": state_id},
+                {"$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)}},
+                upsert=True,
+            )
+        await database.migrations.update_one(
+            {"_id": state_id},
+            {"$set": {"last_id": None, "completed_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        logger.info(f"Datetime migration converted {converted[name]} documents in {name}")
+    return converted
+
+# ============== Pagination ==============
+
+PAGE_SIZE_DEFAULT = int(os.environ.get('PAGE_SIZE_DEFAULT', '50'))
+PAGE_SIZE_MAX = int(os.environ.get('PAGE_SIZE_MAX', '200'))
+
+def encode_cursor(sort_value, id_value) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = {"$date": parse_datetime(sort_value).isoformat()}
+    raw = json.dumps([sort_value, id_value], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        decoded = json.loads(raw)
+        if not isinstance(decoded, list) or len(decoded) != 2:
+            raise ValueError("cursor must be a [sort, id] pair")
+        sort_value, id_value = decoded
+        if isinstance(sort_value, dict) and set(sort_value) == {"$date"}:
+            sort_value = parse_datetime(datetime.fromisoformat(sort_value["$date"]))
+        # Anything else that is not a scalar would reach the query as an operator
+        for value in (sort_value, id_value):
+            if not isinstance(value, (str, int, float, datetime)) or isinstance(value, bool):
+                raise ValueError("cursor values must be scalars")
+        return sort_value, id_value
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(collection, query: dict, projection: dict, sort_field: str, id_field: str,
+                   limit: int, cursor: Optional[str] = None, order: str = "desc"):
+    """Keyset-paginate ``collection`` over ``(sort_field, id_field)``.
+
+    Returns ``(docs, next_cursor, total)``. The tiebreak on ``id_field`` keeps
+    pages stable when timestamps collide. Totals come from the collection
+    metadata when unfiltered and from an index-backed count otherwise.
+    Timestamps must be native datetimes for correct ordering, so run the
+    datetime migration before relying on cursors over legacy rows.
+    """
+    direction = -1 if order == "desc" else 1
+    page_query = dict(query)
+    if cursor:
+        sort_value, id_value = decode_cursor(cursor)
+        op = "$lt" if direction == -1 else "$gt"
+        after_cursor = {"$or": [
+            {sort_field: {op: sort_value}},
+            {sort_field: sort_value, id_field: {op: id_value}},
+        ]}
+        page_query = {"$and": [query, after_cursor]} if query else after_cursor
+    docs = await collection.find(page_query, projection) \
+        .sort([(sort_field, direction), (id_field, direction)]) \
+        .limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1].get(sort_field), docs[-1].get(id_field))
+    if query:
+        total = await collection.count_documents(query)
+    else:
+        total = await collection.estimated_document_count()
+    return docs, next_cursor, total
+
+SEARCH_MAX_OFFSET = int(os.environ.get('SEARCH_MAX_OFFSET', '1000'))
+
+async def search_contacts(q: str, limit: int, cursor: Optional[str] = None, read: Optional[bool] = None):
+    """Relevance-ranked text search over contact submissions.
+
+    Text scores cannot be used as keyset bounds, so the cursor encodes an
+    offset, capped at ``SEARCH_MAX_OFFSET`` to keep deep pages bounded.
+    Returns ``(docs, next_cursor, total)``; each doc carries its ``score``.
+    ``total`` is only known on the first page, and only while the matches fit
+    in the reachable pages: a broad term would otherwise cost a count of
+    every matching document.
+    """
+    offset = 0
+    if cursor:
+        offset, kind = decode_cursor(cursor)
+        if kind != "search" or not isinstance(offset, int) or offset < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if offset > SEARCH_MAX_OFFSET:
+        raise HTTPException(status_code=400, detail="Search page too deep, refine the query")
+    query = {"$text": {"$search": q}}
+    if read is not None:
+        query["read"] = read
+    score = {"score": {"$meta": "textScore"}}
+    docs = await reporting_db.contact_submissions.find(query, {"_id": 0, **score}) \
+        .sort([("score", {"$meta": "textScore"}), ("created_at", -1)]) \
+        .skip(offset).limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(offset + limit, "search")
+    total = None
+    if offset == 0 and next_cursor is None:
+        total = len(docs)
+    elif offset == 0:
+        reachable = SEARCH_MAX_OFFSET + limit
+        count = await reporting_db.contact_submissions.count_documents(query, limit=reachable + 1)
+        total = count if count <= reachable else None
+    return docs, next_cursor, total
+
+def set_page_headers(response: Response, next_cursor: Optional[str], total: Optional[int]) -> None:
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+# ============== Streaming Export ==============
+
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+CONTACT_EXPORT_FIELDS = ["id", "name", "email", "phone", "subject", "message", "read", "created_at"]
+USER_EXPORT_FIELDS = ["user_id", "email", "name", "picture", "role", "auth_provider", "created_at", "updated_at"]
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return parse_datetime(value).isoformat()
+    return value
+
+def date_range_query(field: str, since: Optional[datetime], until: Optional[datetime]) -> dict:
+    bounds = {}
+    if since is not None:
+        bounds["$gte"] = parse_datetime(since)
+    if until is not None:
+        bounds["$lt"] = parse_datetime(until)
+    return {field: bounds} if bounds else {}
+
+async def stream_export(collection, query: dict, fields: List[str], fmt: str, sort_field: str):
+    """Yield ``fmt`` (ndjson or csv) chunks, one per cursor batch.
+
+    Only ``fields`` are projected, so secrets such as ``password_hash`` never
+    leave the database. Memory stays bounded by ``EXPORT_BATCH_SIZE``.
+    """
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    cursor = collection.find(query, projection).sort(sort_field, 1).batch_size(EXPORT_BATCH_SIZE)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(fields)
+    rows = 0
+    async for doc in cursor:
+        if writer:
+            writer.writerow(["" if doc.get(f) is None else _export_value(doc.get(f)) for f in fields])
+        else:
+            buffer.write(json.dumps({f: _export_value(doc.get(f)) for f in fields}, default=str))
+            buffer.write("\n")
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def export_response(generator, fmt: str, name: str) -> StreamingResponse:
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    filename = f"{name}-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}.{fmt}"
+    return StreamingResponse(
+        generator,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# ============== Upstream HTTP Client ==============
+
+OAUTH_PROVIDER_URL = os.environ.get('OAUTH_PROVIDER_URL', 'https://demobackend.emergentagent.com')
+OAUTH_SESSION_DATA_PATH = "/auth/v1/env/oauth/session-data"
+
+class LatencyRecorder:
+    """Call counts, errors and latency percentiles over a sliding window."""
+
+    def __init__(self, window: int = 1024):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_seconds / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 2),
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "max_ms": round(self.max_seconds * 1000, 2),
+        }
+
+class CircuitBreaker:
+    """Fails fast while an upstream keeps erroring.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls are rejected for ``reset_seconds``. The next call is then let
+    through as a trial: success closes the breaker, failure reopens it.
+    A threshold of 0 disables the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0 or self.state == "closed":
+            return True
+        if self.retry_after() > 0:
+            self.rejected += 1
+            return False
+        # Half-open: this call is the trial; others wait another period
+        self.state = "half_open"
+        self._opened_at = time.monotonic()
+        return True
+
+    def retry_after(self) -> float:
+        return max(self.reset_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.state = "closed"
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or (self.state == "closed" and self.consecutive_failures >= self.failure_threshold > 0):
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self.opened += 1
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1) if self.state != "closed" else 0.0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+class SingleFlightCache:
+    """Runs one call per key at a time and remembers results briefly.
+
+    Concurrent callers with the same key await the same task. Successful
+    results are kept for ``ttl_seconds`` so retries get the same answer;
+    errors are never cached. The call runs to completion even if the
+    request that started it goes away.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._in_flight: dict = {}
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        self.calls = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    async def run(self, key: str, fn):
+        entry = self._results.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self.cache_hits += 1
+            return entry[0]
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _complete(self, key: str, task) -> None:
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or self.ttl_seconds <= 0:
+            return
+        self._results.pop(key, None)
+        self._results[key] = (task.result(), time.monotonic() + self.ttl_seconds)
+        now = time.monotonic()
+        while self._results and (len(self._results) > self.max_size or next(iter(self._results.values()))[1] <= now):
+            self._results.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._in_flight),
+            "cached": len(self._results),
+        }
+
+oauth_upstream_latency = LatencyRecorder()
+oauth_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get('OAUTH_BREAKER_FAILURES', '5')),
+    reset_seconds=float(os.environ.get('OAUTH_BREAKER_RESET_SECONDS', '30')),
+)
+oauth_exchanges = SingleFlightCache(
+    ttl_seconds=float(os.environ.get('OAUTH_SESSION_CACHE_SECONDS', '60')),
+    max_size=1000,
+)
+_auth_http_client: Optional["httpx.AsyncClient"] = None
+
+def get_auth_http_client() -> "httpx.AsyncClient":
+    """Shared keep-alive client for the OAuth provider, created on first use."""
+    global _auth_http_client
+    import httpx
+    if _auth_http_client is None or _auth_http_client.is_closed:
+        _auth_http_client = httpx.AsyncClient(
+            base_url=OAUTH_PROVIDER_URL,
+            timeout=httpx.Timeout(
+                float(os.environ.get('OAUTH_READ_TIMEOUT_SECONDS', '10')),
+                connect=float(os.environ.get('OAUTH_CONNECT_TIMEOUT_SECONDS', '3')),
+            ),
+            limits=httpx.Limits(
+                max_connections=int(os.environ.get('OAUTH_MAX_CONNECTIONS', '20')),
+                max_keepalive_connections=int(os.environ.get('OAUTH_MAX_KEEPALIVE', '10')),
+                keepalive_expiry=float(os.environ.get('OAUTH_KEEPALIVE_EXPIRY_SECONDS', '30')),
+            ),
+        )
+    return _auth_http_client
+
+async def close_auth_http_client() -> None:
+    global _auth_http_client
+    if _auth_http_client is not None:
+        await _auth_http_client.aclose()
+        _auth_http_client = None
+
+# ============== Background Tasks ==============
+
+class BackgroundTask:
+    """The single asyncio task behind a component's ``start``/``stop``.
+
+    ``start`` does nothing while the task is running; ``stop`` cancels it and
+    waits for it to unwind.
+    """
+
+    def __init__(self):
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self, coro_fn) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(coro_fn())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+async def run_periodically(fn, interval_seconds: float, name: str, sleep_first: bool = False) -> None:
+    """Await ``fn()`` every ``interval_seconds`` until cancelled; errors are logged, not raised."""
+    while True:
+        if sleep_first:
+            await asyncio.sleep(interval_seconds)
+        try:
+            await fn()
+        except Exception as e:
+            logger.error(f"{name} error: {e}")
+        if not sleep_first:
+            await asyncio.sleep(interval_seconds)
+
+# ============== Write-Behind Inserts ==============
+
+class WriteBehindBuffer:
+    """Coalesces single-document inserts into ``insert_many`` batches.
+
+    ``ack`` mode is a group commit: each caller waits until the batch holding
+    its document is written, and callers that arrive while a batch is in
+    flight share the next ``insert_many``. Write errors reach every caller in
+    the failed batch. In ``buffered`` mode documents are queued and flushed
+    when ``max_batch`` is reached or every ``flush_interval_seconds``, trading
+    durability of the last interval for fewer round trips. Pending documents
+    are flushed on shutdown.
+
+    A buffered batch that fails to write goes back to the front of the queue
+    and is retried with exponential backoff, up to ``max_retries`` times. Once
+    ``max_pending`` documents are queued, inserts are written through so
+    callers see the error instead of growing the backlog.
+
+    After every successful write the collection's change version is bumped
+    (when ``versioned``) and ``on_written`` is called with the documents, so
+    ETags, events and counters never run ahead of the database.
+    """
+
+    MAX_BACKOFF_SECONDS = 30.0
+
+    def __init__(self, collection_name: str, mode: str, max_batch: int, flush_interval_seconds: float,
+                 max_retries: int = 8, max_pending: int = 10000, versioned: bool = True, on_written=None):
+        self.collection_name = collection_name
+        self.mode = mode
+        self.max_batch = max(max_batch, 1)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+        self.max_pending = max(max_pending, self.max_batch)
+        self.versioned = versioned
+        self.on_written = on_written
+        self._pending: List[tuple] = []   # (doc, future or None)
+        self._lock = asyncio.Lock()
+        self._background = BackgroundTask()
+        self._consecutive_failures = 0
+        self._retry_at = 0.0
+        self.batches = 0
+        self.documents = 0
+        self.failed = 0
+        self.retries = 0
+        self.largest_batch = 0
+        self.flush_latency = LatencyRecorder()
+
+    @property
+    def buffered(self) -> bool:
+        return self.mode == "buffered"
+
+    async def insert(self, doc: dict) -> None:
+        if not self.buffered:
+            # Whoever holds the flush lock writes everything queued so far
+            written = asyncio.get_running_loop().create_future()
+            self._pending.append((doc, written))
+            await self.flush()
+            await written
+            return
+        if len(self._pending) >= self.max_pending:
+            await db[self.collection_name].insert_one(doc)
+            await self._written([doc])
+            return
+        self._pending.append((doc, None))
+        if len(self._pending) >= self.max_batch:
+            await self.flush()
+
+    async def _written(self, docs: List[dict]) -> None:
+        try:
+            if self.versioned:
+                await change_versions.bump(self.collection_name)
+            if self.on_written is not None:
+                self.on_written(docs)
+        except Exception as e:
+            logger.error(f"Write-behind post-write hook for {self.collection_name} failed: {e}")
+
+    async def flush(self, final: bool = False) -> int:
+        """Write pending batches. Waits out any retry backoff unless ``final``."""
+        async with self._lock:
+            written = 0
+            while self._pending and (final or time.monotonic() >= self._retry_at):
+                entries = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                batch = [doc for doc, _ in entries]
+                started = time.perf_counter()
+                rejected = {}
+                try:
+                    await db[self.collection_name].insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    # The server applied the batch. Duplicate keys are documents
+                    # an earlier attempt already wrote; other errors will not
+                    # succeed on retry.
+                    rejected = {
+                        error["index"]: e for error in e.details.get("writeErrors", []) if error.get("code") != 11000
+                    }
+                    if rejected:
+                        self.failed += len(rejected)
+                        logger.error(
+                            f"Write-behind flush to {self.collection_name} rejected {len(rejected)} documents: {e}"
+                        )
+                except Exception as e:
+                    self.flush_latency.record(time.perf_counter() - started, error=True)
+                    if self.buffered:
+                        self._retry_later(entries, e, final)
+                        break
+                    # Callers are waiting on this batch; they get the error
+                    rejected = dict.fromkeys(range(len(entries)), e)
+                    self.failed += len(entries)
+                else:
+                    self.flush_latency.record(time.perf_counter() - started)
+                    self._consecutive_failures = 0
+                    self._retry_at = 0.0
+                for i, (_, future) in enumerate(entries):
+                    if future is not None and not future.done():
+                        if i in rejected:
+                            future.set_exception(rejected[i])
+                        else:
+                            future.set_result(None)
+                inserted = [doc for i, doc in enumerate(batch) if i not in rejected]
+                if inserted:
+                    await self._written(inserted)
+                    self.batches += 1
+                    self.documents += len(inserted)
+                    self.largest_batch = max(self.largest_batch, len(inserted))
+                    written += len(inserted)
+            return written
+
+    def _retry_later(self, batch: List[tuple], error: Exception, final: bool) -> None:
+        self._consecutive_failures += 1
+        if final or self._consecutive_failures > self.max_retries:
+            lost = batch + (self._pending if final else [])
+            if final:
+                self._pending = []
+            self.failed += len(lost)
+            self._consecutive_failures = 0
+            reason = "on shutdown" if final else f"after {self.max_retries} retries"
+            logger.error(f"Write-behind flush to {self.collection_name} dropped {len(lost)} documents {reason}: {error}")
+            return
+        # Requeue in order; insert_many already set _id, so a batch that was
+        # written despite the error comes back as duplicate keys
+        self._pending[:0] = batch
+        delay = min(self.flush_interval_seconds * 2 ** self._consecutive_failures, self.MAX_BACKOFF_SECONDS)
+        self._retry_at = time.monotonic() + delay
+        self.retries += 1
+        logger.warning(
+            f"Write-behind flush to {self.collection_name} failed for {len(batch)} documents, "
+            f"retrying in {delay:.1f}s: {error}"
+        )
+
+    def start(self) -> None:
+        if self.buffered:
+            self._background.start(lambda: run_periodically(
+                self.flush, self.flush_interval_seconds, "Write-behind flusher", sleep_first=True,
+            ))
+
+    async def stop(self) -> None:
+        await self._background.stop()
+        await self.flush(final=True)
+
+    def stats(self) -> dict:
+        return {
+            "collection": self.collection_name,
+            "mode": self.mode,
+            "max_batch": self.max_batch,
+            "flush_interval_seconds": self.flush_interval_seconds,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "documents": self.documents,
+            "failed": self.failed,
+            "retries": self.retries,
+            "mean_batch_size": round(self.documents / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "flush_latency": self.flush_latency.stats(),
+        }
+
+WRITE_BEHIND_MODE = os.environ.get('WRITE_BEHIND_MODE', 'ack')
+WRITE_BEHIND_MAX_BATCH = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', '100'))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.environ.get('WRITE_BEHIND_FLUSH_SECONDS', '0.25'))
+WRITE_BEHIND_MAX_RETRIES = int(os.environ.get('WRITE_BEHIND_MAX_RETRIES', '8'))
+WRITE_BEHIND_MAX_PENDING = int(os.environ.get('WRITE_BEHIND_MAX_PENDING', '10000'))
+
+# Nothing serves status checks with an ETag, so their writes skip the bump
+status_check_writer = WriteBehindBuffer(
+    "status_checks", WRITE_BEHIND_MODE, WRITE_BEHIND_MAX_BATCH, WRITE_BEHIND_FLUSH_SECONDS,
+    WRITE_BEHIND_MAX_RETRIES, WRITE_BEHIND_MAX_PENDING, versioned=False,
+)
+contact_writer = WriteBehindBuffer(
+    "contact_submissions", WRITE_BEHIND_MODE, WRITE_BEHIND_MAX_BATCH, WRITE_BEHIND_FLUSH_SECONDS,
+    WRITE_BEHIND_MAX_RETRIES, WRITE_BEHIND_MAX_PENDING,
+    on_written=lambda docs: contacts_written(docs),
+)
+write_behind_buffers = [status_check_writer, contact_writer]
+
+# ============== Fast Responses ==============
+
+# Routes listed here serialise trusted database documents without running
+# Pydantic validation. Remove a route name to fall back to response_model.
+FAST_RESPONSE_ROUTES = {
+    name.strip() for name in os.environ.get(
+        'FAST_RESPONSE_ROUTES',
+        'admin_get_contacts,admin_get_users,get_status_checks,get_contact_submissions,admin_search_contacts',
+    ).split(',') if name.strip()
+}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed."""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_json_default)
+        return json.dumps(content, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+def construct_trusted(model_cls, docs: List[dict]) -> List[dict]:
+    """Shape trusted documents like ``model_cls`` without validating them."""
+    return [dict(model_cls.model_construct(**doc)) for doc in docs]
+
+def list_response(route: str, response: Response, docs: List[dict], model_cls=None):
+    """Return ``docs`` via the fast path when ``route`` opts in.
+
+    Returning a Response bypasses response_model, so headers already set on
+    the injected ``response`` are carried over explicitly.
+    """
+    if route not in FAST_RESPONSE_ROUTES:
+        return docs
+    content = construct_trusted(model_cls, docs) if model_cls is not None else docs
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return FastJSONResponse(content, headers=headers)
+
+def user_response(user: "User") -> "UserResponse":
+    return UserResponse.model_construct(**{field: getattr(user, field) for field in UserResponse.model_fields})
+
+# ============== Dashboard Stats ==============
+
+class DashboardStats:
+    """Admin dashboard aggregates with an incrementally maintained cache.
+
+    Write routes on this worker apply deltas so the cached counts stay
+    current without re-reading the collections. Writes made by other workers
+    show up as change versions this worker did not bump; the next ``get``
+    after one recomputes through the aggregation pipelines, as does any
+    ``get`` more than ``refresh_seconds`` after the last recompute. Daily
+    histograms only include rows whose timestamps are native datetimes.
+    """
+
+    COLLECTIONS = ("contact_submissions", "users")
+
+    def __init__(self, refresh_seconds: float, days: int):
+        self.refresh_seconds = refresh_seconds
+        self.days = days
+        self._stats = None
+        self._computed_at = 0.0
+        self._foreign_seen: tuple = ()
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> dict:
+        if self._stale():
+            async with self._lock:
+                if self._stale():
+                    # Taken first so writes landing during compute trigger another
+                    foreign = self._foreign_writes()
+                    self._stats = await self.compute()
+                    self._computed_at = time.monotonic()
+                    self._foreign_seen = foreign
+        return self._stats
+
+    def _foreign_writes(self) -> tuple:
+        return tuple(change_versions.foreign(name) for name in self.COLLECTIONS)
+
+    def _stale(self) -> bool:
+        return (
+            self._stats is None
+            or time.monotonic() - self._computed_at > self.refresh_seconds
+            or self._foreign_writes() != self._foreign_seen
+        )
+
+    def invalidate(self) -> None:
+        self._stats = None
+
+    async def compute(self) -> dict:
+        since = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=self.days - 1)
+        daily = [
+            {"$match": {"created_at": {"$gte": since}}},
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}, "count": {"$sum": 1}}},
+        ]
+        # The daily pipelines lead with $match so they run off the
+        # created_at indexes; $facet stages cannot use indexes.
+        by_read = await reporting_db.contact_submissions.aggregate([
+            {"$group": {"_id": "$read", "count": {"$sum": 1}}},
+        ]).to_list(None)
+        contacts_daily = await reporting_db.contact_submissions.aggregate(daily).to_list(None)
+        users_facets = await reporting_db.users.aggregate([{"$facet": {
+            "by_role": [{"$group": {"_id": "$role", "count": {"$sum": 1}}}],
+            "by_auth_provider": [{"$group": {"_id": "$auth_provider", "count": {"$sum": 1}}}],
+        }}]).to_list(1)
+        users_daily = await reporting_db.users.aggregate(daily).to_list(None)
+        users = users_facets[0]
+        by_read = {bool(row["_id"]): row["count"] for row in by_read}
+        by_role = {row["_id"] or "visitor": row["count"] for row in users["by_role"]}
+        return {
+            "contacts": {
+                "total": sum(by_read.values()),
+                "unread": by_read.get(False, 0),
+                "read": by_read.get(True, 0),
+                "daily": {row["_id"]: row["count"] for row in contacts_daily},
+            },
+            "users": {
+                "total": sum(by_role.values()),
+                "by_role": by_role,
+                "by_auth_provider": {row["_id"] or "email": row["count"] for row in users["by_auth_provider"]},
+                "daily": {row["_id"]: row["count"] for row in users_daily},
+            },
+        }
+
+    @staticmethod
+    def _bump(counts: dict, key, amount: int) -> None:
+        counts[key] = max(counts.get(key, 0) + amount, 0)
+
+    def contact_added(self, created_at: datetime) -> None:
+        if self._stats is None:
+            return
+        contacts = self._stats["contacts"]
+        contacts["total"] += 1
+        contacts["unread"] += 1
+        self._bump(contacts["daily"], parse_datetime(created_at).strftime("%Y-%m-%d"), 1)
+
+    def contact_read_changed(self, read: bool) -> None:
+        if self._stats is None:
+            return
+        contacts = self._stats["contacts"]
+        self._bump(contacts, "read", 1 if read else -1)
+        self._bump(contacts, "unread", -1 if read else 1)
+
+    def contact_deleted(self, read: bool, created_at) -> None:
+        if self._stats is None:
+            return
+        contacts = self._stats["contacts"]
+        self._bump(contacts, "total", -1)
+        self._bump(contacts, "read" if read else "unread", -1)
+        if isinstance(created_at, datetime):
+            self._bump(contacts["daily"], parse_datetime(created_at).strftime("%Y-%m-%d"), -1)
+
+    def user_added(self, role: str, auth_provider: str, created_at: datetime) -> None:
+        if self._stats is None:
+            return
+        users = self._stats["users"]
+        users["total"] += 1
+        self._bump(users["by_role"], role, 1)
+        self._bump(users["by_auth_provider"], auth_provider, 1)
+        self._bump(users["daily"], parse_datetime(created_at).strftime("%Y-%m-%d"), 1)
+
+    def user_role_changed(self, old_role: str, new_role: str) -> None:
+        if self._stats is None:
+            return
+        self._bump(self._stats["users"]["by_role"], old_role, -1)
+        self._bump(self._stats["users"]["by_role"], new_role, 1)
+
+dashboard_stats = DashboardStats(
+    refresh_seconds=float(os.environ.get('STATS_REFRESH_SECONDS', '300')),
+    days=int(os.environ.get('STATS_DAYS', '30')),
+)
+
+# ============== Change Versions & ETags ==============
+
+class ChangeVersions:
+    """Per-collection change counters that back ETags on read routes.
+
+    Every write route calls ``bump``. By default bumps ``$inc`` a counter in
+    the ``change_versions`` collection and a background poll picks up other
+    workers' bumps, so a 304 can be stale for at most ``poll_seconds``.
+    Without ``shared`` the counters live in this process behind a random
+    epoch. That never sees writes made by another worker, so it is only
+    correct for a single-worker deployment. ``foreign`` counts the bumps this
+    worker did not make itself, which is how cached aggregates notice other
+    workers' writes.
+    """
+
+    def __init__(self, shared: bool, poll_seconds: float):
+        self.shared = shared
+        self.poll_seconds = poll_seconds
+        self.epoch = "s" if shared else uuid.uuid4().hex[:8]
+        self._versions: dict = {}
+        self._own: dict = {}
+        self._background = BackgroundTask()
+
+    def get(self, name: str) -> str:
+        return f"{self.epoch}.{self._versions.get(name, 0)}"
+
+    def foreign(self, name: str) -> int:
+        """How many of the bumps seen for ``name`` came from other workers."""
+        return self._versions.get(name, 0) - self._own.get(name, 0)
+
+    async def bump(self, name: str) -> None:
+        self._own[name] = self._own.get(name, 0) + 1
+        if not self.shared:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return
+        doc = await db.change_versions.find_one_and_update(
+            {"_id": name}, {"$inc": {"version": 1}},
+            upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        self._versions[name] = max(self._versions.get(name, 0), doc["version"])
+
+    async def refresh(self) -> None:
+        async for doc in db.change_versions.find({}):
+            self._versions[doc["_id"]] = max(self._versions.get(doc["_id"], 0), doc["version"])
+
+    def start(self) -> None:
+        if self.shared:
+            self._background.start(lambda: run_periodically(self.refresh, self.poll_seconds, "Change version poll"))
+
+    async def stop(self) -> None:
+        await self._background.stop()
+
+change_versions = ChangeVersions(
+    shared=os.environ.get('ETAG_SHARED_VERSIONS', '1').lower() in ('1', 'true', 'yes'),
+    poll_seconds=float(os.environ.get('ETAG_POLL_SECONDS', '1')),
+)
+
+def build_etag(request: Request, collections: List[str], *parts) -> str:
+    key = "|".join(
+        [change_versions.get(name) for name in collections]
+        + [request.url.path, str(request.url.query)]
+        + [str(part) for part in parts]
+    )
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    # Weak comparison: W/"x" and "x" are equivalent for GET revalidation
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+def not_modified(request: Request, response: Response, collections: List[str], *parts) -> Optional[Response]:
+    """Set the ETag on ``response`` and return a 304 when the client is current."""
+    etag = build_etag(request, collections, *parts)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+# Versions are bumped on the primary. A body read from a lagging secondary
+# could be cached under the new tag and served as current until the next
+# write, so reporting routes only use ETags while they read the primary.
+REPORTING_ETAGS = os.environ.get('REPORTING_READ_PREFERENCE', 'primary') == 'primary'
+
+def reporting_not_modified(request: Request, response: Response, collections: List[str], *parts) -> Optional[Response]:
+    """``not_modified`` for routes that read through ``reporting_db``."""
+    if not REPORTING_ETAGS:
+        return None
+    return not_modified(request, response, collections, *parts)
+
+# ============== Live Contact Feed ==============
+
+class FeedSubscriber:
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.lagged = False
+
+class ContactFeed:
+    """In-process pub/sub of contact submission changes for SSE clients.
+
+    Each subscriber has a bounded queue. A client that falls behind is not
+    allowed to slow publishers down: its backlog is dropped and it gets a
+    single ``resync`` event telling it to reload the list.
+
+    With ``source="changestream"`` events come from a MongoDB change stream
+    (replica set required), so every worker sees writes made by any worker.
+    Local publishes from the routes are then ignored to avoid duplicates.
+    """
+
+    def __init__(self, source: str, max_queue: int, max_clients: int):
+        self.source = source
+        self.max_queue = max_queue
+        self.max_clients = max_clients
+        self._subscribers: set = set()
+        self._background = BackgroundTask()
+        self.published = 0
+        self.resyncs = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_clients
+
+    def subscribe(self) -> FeedSubscriber:
+        if self.full:
+            raise HTTPException(status_code=503, detail="Too many live feed clients")
+        subscriber = FeedSubscriber(self.max_queue)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: FeedSubscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _deliver(self, event: str, data: dict) -> None:
+        self.published += 1
+        for subscriber in self._subscribers:
+            if subscriber.lagged:
+                continue
+            try:
+                subscriber.queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(("resync", {}))
+                subscriber.lagged = True
+                self.resyncs += 1
+
+    def publish(self, event: str, data: dict) -> None:
+        """Publish from a route; ignored when a change stream is the source."""
+        if self.source != "changestream":
+            self._deliver(event, data)
+
+    async def _watch(self):
+        operations = {"insert": "created", "update": "updated", "replace": "updated", "delete": "deleted"}
+        while True:
+            try:
+                async with db.contact_submissions.watch(full_document="updateLookup") as stream:
+                    async for change in stream:
+                        event = operations.get(change["operationType"])
+                        if event is None:
+                            continue
+                        doc = change.get("fullDocument") or {}
+                        doc.pop("_id", None)
+                        if event == "deleted":
+                            # Deletes only carry _id; clients reload on resync
+                            self._deliver("resync", {})
+                        else:
+                            self._deliver(event, normalize_datetimes(doc, "created_at"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Contact change stream error: {e}")
+                await asyncio.sleep(5)
+
+    def start(self) -> None:
+        if self.source == "changestream":
+            self._background.start(self._watch)
+
+    async def stop(self) -> None:
+        await self._background.stop()
+
+contact_feed = ContactFeed(
+    source=os.environ.get('CONTACT_FEED_SOURCE', 'local'),
+    max_queue=int(os.environ.get('SSE_CLIENT_QUEUE', '100')),
+    max_clients=int(os.environ.get('SSE_MAX_CLIENTS', '50')),
+)
+SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', '15'))
+
+def format_sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    payload = json.dumps(data, default=_json_default, separators=(",", ":"))
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {payload}\n\n"
+
+# ============== Indexes ==============
+
+# Every index the app relies on. Unique constraints mirror the uniqueness the
+# route code already assumes (one account per email, one row per token/id).
+INDEX_SPECS = [
+    {"collection": "users", "keys": [("email", 1)], "name": "email_unique", "unique": True},
+    {"collection": "users", "keys": [("user_id", 1)], "name": "user_id_unique", "unique": True},
+    {"collection": "user_sessions", "keys": [("session_token", 1)], "name": "session_token_unique", "unique": True},
+    {"collection": "user_sessions", "keys": [("session_id", 1)], "name": "session_id_unique", "unique": True},
+    {"collection": "user_sessions", "keys": [("user_id", 1)], "name": "user_id"},
+    {"collection": "user_sessions", "keys": [("last_seen_at", -1)], "name": "last_seen_at"},
+    {"collection": "user_sessions", "keys": [("user_id", 1), ("last_seen_at", -1), ("created_at", -1)], "name": "user_id_last_seen_at"},
+    {"collection": "user_sessions", "keys": [("expires_at", 1)], "name": "expires_at_ttl", "expireAfterSeconds": 0},
+    {"collection": "password_reset_tokens", "keys": [("token", 1)], "name": "token_unique", "unique": True},
+    {"collection": "password_reset_tokens", "keys": [("expires_at", 1)], "name": "expires_at_ttl", "expireAfterSeconds": 0},
+    {"collection": "contact_submissions", "keys": [("id", 1)], "name": "id_unique", "unique": True},
+    {"collection": "contact_submissions", "keys": [("created_at", -1), ("id", -1)], "name": "created_at_id"},
+    {"collection": "contact_submissions", "keys": [("read", 1), ("created_at", -1), ("id", -1)], "name": "read_created_at_id"},
+    {"collection": "contact_submissions", "keys": [("name", "text"), ("email", "text"), ("subject", "text"), ("message", "text")],
+     "name": "contact_text", "weights": {"name": 5, "email": 5, "subject": 3, "message": 1}, "default_language": "english"},
+    {"collection": "users", "keys": [("created_at", -1), ("user_id", -1)], "name": "created_at_user_id"},
+    {"collection": "users", "keys": [("role", 1), ("created_at", -1), ("user_id", -1)], "name": "role_created_at_user_id"},
+    {"collection": "users", "keys": [("auth_provider", 1), ("created_at", -1), ("user_id", -1)], "name": "auth_provider_created_at_user_id"},
+    {"collection": "status_checks", "keys": [("timestamp", -1), ("id", -1)], "name": "timestamp_id"},
+    {"collection": "session_revocations", "keys": [("revoked_at", 1)], "name": "revoked_at"},
+    {"collection": "session_revocations", "keys": [("expires_at", 1)], "name": "expires_at_ttl", "expireAfterSeconds": 0},
+    {"collection": "session_cache_invalidations", "keys": [("invalidated_at", 1)], "name": "invalidated_at"},
+    {"collection": "session_cache_invalidations", "keys": [("expires_at", 1)], "name": "expires_at_ttl", "expireAfterSeconds": 0},
+]
+
+# Query shapes issued by this module and the index that serves each of them.
+QUERY_SHAPES = [
+    {"route": "get_current_user", "collection": "user_sessions", "op": "find_one", "filter": {"session_token": "?"}, "index": "session_token_unique"},
+    {"route": "get_current_user", "collection": "users", "op": "find_one", "filter": {"user_id": "?"}, "index": "user_id_unique"},
+    {"route": "register", "collection": "users", "op": "insert_one", "filter": {"email": "?"}, "index": "email_unique"},
+    {"route": "login", "collection": "users", "op": "find_one", "filter": {"email": "?"}, "index": "email_unique"},
+    {"route": "login", "collection": "users", "op": "update_one", "filter": {"user_id": "?", "password_hash": "?"}, "index": "user_id_unique"},
+    {"route": "process_oauth_session", "collection": "users", "op": "find_one_and_update", "filter": {"email": "?"}, "index": "email_unique"},
+    {"route": "logout", "collection": "user_sessions", "op": "find_one_and_delete", "filter": {"session_token": "?"}, "index": "session_token_unique"},
+    {"route": "logout", "collection": "user_sessions", "op": "delete_one", "filter": {"session_id": "?"}, "index": "session_id_unique"},
+    {"route": "session_activity", "collection": "user_sessions", "op": "update_one", "filter": {"session_token": "?"}, "index": "session_token_unique"},
+    {"route": "session_activity", "collection": "user_sessions", "op": "update_one", "filter": {"session_id": "?"}, "index": "session_id_unique"},
+    {"route": "admin_get_active_sessions", "collection": "user_sessions", "op": "aggregate", "filter": {"last_seen_at": {"$gte": "?"}}, "index": "last_seen_at"},
+    {"route": "admin_get_user_sessions", "collection": "user_sessions", "op": "find", "filter": {"user_id": "?"}, "index": "user_id_last_seen_at"},
+    {"route": "admin_get_user_sessions", "collection": "user_sessions", "op": "count_documents", "filter": {"user_id": "?"}, "index": "user_id_last_seen_at"},
+    {"route": "admin_revoke_user_session", "collection": "user_sessions", "op": "find_one_and_delete", "filter": {"session_id": "?", "user_id": "?"}, "index": "session_id_unique"},
+    {"route": "admin_revoke_user_sessions", "collection": "user_sessions", "op": "delete_many", "filter": {"user_id": "?"}, "index": "user_id"},
+    {"route": "session_revocations", "collection": "session_revocations", "op": "find", "filter": {"revoked_at": {"$gte": "?"}}, "index": "revoked_at"},
+    {"route": "session_cache", "collection": "session_cache_invalidations", "op": "find", "filter": {"invalidated_at": {"$gte": "?"}}, "index": "invalidated_at"},
+    {"route": "request_password_reset", "collection": "users", "op": "find_one", "filter": {"email": "?"}, "index": "email_unique"},
+    {"route": "confirm_password_reset", "collection": "password_reset_tokens", "op": "find_one_and_update", "filter": {"token": "?", "used": "?", "$or": [{"expires_at": {"$gt": "?"}}, {"expires_at": {"$gt": "?"}}]}, "index": "token_unique"},
+    {"route": "confirm_password_reset", "collection": "users", "op": "update_one", "filter": {"user_id": "?"}, "index": "user_id_unique"},
+    {"route": "confirm_password_reset", "collection": "user_sessions", "op": "delete_many", "filter": {"user_id": "?"}, "index": "user_id"},
+    {"route": "update_preferences", "collection": "users", "op": "update_one", "filter": {"user_id": "?"}, "index": "user_id_unique"},
+    {"route": "admin_update_contact", "collection": "contact_submissions", "op": "update_one", "filter": {"id": "?"}, "index": "id_unique"},
+    {"route": "admin_delete_contact", "collection": "contact_submissions", "op": "find_one_and_delete", "filter": {"id": "?"}, "index": "id_unique"},
+    {"route": "admin_search_contacts", "collection": "contact_submissions", "op": "find", "filter": {"$text": {"$search": "?"}}, "index": "contact_text"},
+    {"route": "admin_search_contacts", "collection": "contact_submissions", "op": "count_documents", "filter": {"$text": {"$search": "?"}}, "index": "contact_text"},
+    {"route": "admin_get_stats", "collection": "contact_submissions", "op": "aggregate", "filter": {"created_at": {"$gte": "?"}}, "index": "created_at_id"},
+    {"route": "admin_get_stats", "collection": "users", "op": "aggregate", "filter": {"created_at": {"$gte": "?"}}, "index": "created_at_user_id"},
+    {"route": "admin_update_user_role", "collection": "users", "op": "find_one", "filter": {"user_id": "?"}, "index": "user_id_unique"},
+    {"route": "admin_update_user_role", "collection": "users", "op": "update_one", "filter": {"user_id": "?"}, "index": "user_id_unique"},
+    {"route": "admin_update_user_role", "collection": "user_sessions", "op": "delete_many", "filter": {"user_id": "?"}, "index": "user_id"},
+    {"route": "admin_bulk_update_user_roles", "collection": "user_sessions", "op": "delete_many", "filter": {"user_id": {"$in": "?"}}, "index": "user_id"},
+    {"route": "admin_bulk_contacts", "collection": "contact_submissions", "op": "find", "filter": {"id": {"$in": "?"}}, "index": "id_unique"},
+    {"route": "admin_bulk_contacts", "collection": "contact_submissions", "op": "bulk_write", "filter": {"id": "?"}, "index": "id_unique"},
+    {"route": "admin_bulk_contacts", "collection": "contact_submissions", "op": "bulk_write", "filter": {"created_at": {"$lt": "?"}}, "index": "created_at_id"},
+    {"route": "admin_bulk_contacts", "collection": "contact_submissions", "op": "bulk_write", "filter": {"read": "?"}, "index": "read_created_at_id"},
+    {"route": "admin_bulk_contacts", "collection": "contact_submissions", "op": "bulk_write", "filter": {"read": "?", "created_at": {"$lt": "?"}}, "index": "read_created_at_id"},
+    {"route": "admin_bulk_update_user_roles", "collection": "users", "op": "find", "filter": {"user_id": {"$in": "?"}}, "index": "user_id_unique"},
+    {"route": "admin_bulk_update_user_roles", "collection": "users", "op": "bulk_write", "filter": {"user_id": "?"}, "index": "user_id_unique"},
+    {"route": "admin_get_contacts", "collection": "contact_submissions", "op": "find", "filter": {"created_at": {"$lt": "?"}}, "index": "created_at_id"},
+    {"route": "admin_get_contacts", "collection": "contact_submissions", "op": "find", "filter": {"read": "?", "created_at": {"$lt": "?"}}, "index": "read_created_at_id"},
+    {"route": "admin_get_users", "collection": "users", "op": "find", "filter": {"created_at": {"$lt": "?"}}, "index": "created_at_user_id"},
+    {"route": "admin_get_users", "collection": "users", "op": "find", "filter": {"role": "?", "created_at": {"$lt": "?"}}, "index": "role_created_at_user_id"},
+    {"route": "admin_get_users", "collection": "users", "op": "find", "filter": {"auth_provider": "?", "created_at": {"$lt": "?"}}, "index": "auth_provider_created_at_user_id"},
+    {"route": "admin_get_users", "collection": "users", "op": "find", "filter": {"role": "?", "auth_provider": "?", "created_at": {"$lt": "?"}}, "index": "role_created_at_user_id"},
+    {"route": "admin_export_contacts", "collection": "contact_submissions", "op": "find", "filter": {"created_at": {"$gte": "?", "$lt": "?"}}, "index": "created_at_id"},
+    {"route": "admin_export_contacts", "collection": "contact_submissions", "op": "find", "filter": {"read": "?", "created_at": {"$gte": "?", "$lt": "?"}}, "index": "read_created_at_id"},
+    {"route": "admin_export_users", "collection": "users", "op": "find", "filter": {"created_at": {"$gte": "?", "$lt": "?"}}, "index": "created_at_user_id"},
+    {"route": "admin_export_users", "collection": "users", "op": "find", "filter": {"role": "?", "created_at": {"$gte": "?", "$lt": "?"}}, "index": "role_created_at_user_id"},
+    {"route": "admin_export_users", "collection": "users", "op": "find", "filter": {"auth_provider": "?", "created_at": {"$gte": "?", "$lt": "?"}}, "index": "auth_provider_created_at_user_id"},
+    {"route": "admin_export_users", "collection": "users", "op": "find", "filter": {"role": "?", "auth_provider": "?", "created_at": {"$gte": "?", "$lt": "?"}}, "index": "role_created_at_user_id"},
+    {"route": "get_status_checks", "collection": "status_checks", "op": "find", "filter": {"timestamp": {"$lt": "?"}}, "index": "timestamp_id"},
+    {"route": "get_contact_submissions", "collection": "contact_submissions", "op": "find", "filter": {"created_at": {"$lt": "?"}}, "index": "created_at_id"},
+    {"route": "expiry_sweeper", "collection": "user_sessions", "op": "find", "filter": {"expires_at": {"$lt": "?"}}, "index": "expires_at_ttl"},
+    {"route": "expiry_sweeper", "collection": "password_reset_tokens", "op": "find", "filter": {"expires_at": {"$lt": "?"}}, "index": "expires_at_ttl"},
+]
+
+# Indexes that enforce correctness rather than speed: register relies on
+# email_unique to reject existing accounts, so serving without it would
+# create duplicates.
+REQUIRED_INDEXES = {("users", "email_unique")}
+
+async def ensure_indexes(database=None) -> List[str]:
+    """Create every index in INDEX_SPECS. Safe to run on every startup.
+
+    Raises RuntimeError if an index in REQUIRED_INDEXES cannot be built.
+    """
+    database = database if database is not None else db
+    created = []
+    missing_required = []
+    for spec in INDEX_SPECS:
+        options = {k: v for k, v in spec.items() if k not in ("collection", "keys")}
+        try:
+            await database[spec["collection"]].create_index(spec["keys"], **options)
+            created.append(f"{spec['collection']}.{spec['name']}")
+        except Exception as e:
+            # A unique index cannot be built over existing duplicates; keep
+            # serving and surface the problem rather than failing startup.
+            logger.error(f"Failed to ensure index {spec['collection']}.{spec['name']}: {e}")
+            if (spec["collection"], spec["name"]) in REQUIRED_INDEXES:
+                missing_required.append(f"{spec['collection']}.{spec['name']}: {e}")
+    if missing_required:
+        raise RuntimeError(f"Required indexes could not be built: {'; '.join(missing_required)}")
+    return created
+
+def index_report() -> List[dict]:
+    """Map each query shape in this module to the index that serves it."""
+    specs = {(spec["collection"], spec["name"]): spec for spec in INDEX_SPECS}
+    report = []
+    for shape in QUERY_SHAPES:
+        spec = specs.get((shape["collection"], shape["index"]))
+        report.append({
+            **shape,
+            "index_keys": spec["keys"] if spec else None,
+            "unique": bool(spec and spec.get("unique")),
+            "served": spec is not None,
+        })
+    return report
+
+# ============== Expiry Sweeper ==============
+
+class ExpirySweeper:
+    """Background task that deletes expired sessions and spent reset tokens.
+
+    The TTL indexes on ``expires_at`` do most of the work once timestamps are
+    native datetimes; the sweeper also reclaims rows Mongo's TTL monitor does
+    not cover (ISO-string timestamps awaiting migration, used reset tokens)
+    and runs in bounded batches so it never holds a long write lock.
+    """
+
+    def __init__(self, interval_seconds: float, batch_size: int, max_batches: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._background = BackgroundTask()
+        self.runs = 0
+        self.reclaimed = {"user_sessions": 0, "password_reset_tokens": 0}
+        self.last_run_at = None
+        self.last_run_seconds = None
+
+    def _filters(self, now: datetime) -> dict:
+        # ISO strings with a fixed UTC offset sort chronologically, so the
+        # string comparison catches unmigrated rows as well.
+        expired = {"$or": [
+            {"expires_at": {"$lt": now}},
+            {"expires_at": {"$lt": now.isoformat()}},
+        ]}
+        return {
+            "user_sessions": expired,
+            "password_reset_tokens": {"$or": expired["$or"] + [{"used": True}]},
+        }
+
+    async def sweep_once(self, database=None) -> dict:
+        database = database if database is not None else db
+        started = time.perf_counter()
+        reclaimed = {}
+        for name, query in self._filters(datetime.now(timezone.utc)).items():
+            reclaimed[name] = 0
+            for _ in range(self.max_batches):
+                docs = await database[name].find(query, {"_id": 1}).limit(self.batch_size).to_list(self.batch_size)
+                if not docs:
+                    break
+                result = await database[name].delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+                reclaimed[name] += result.deleted_count
+                if len(docs) < self.batch_size:
+                    break
+            self.reclaimed[name] += reclaimed[name]
+        self.runs += 1
+        self.last_run_at = datetime.now(timezone.utc)
+        self.last_run_seconds = round(time.perf_counter() - started, 4)
+        if any(reclaimed.values()):
+            logger.info(f"Expiry sweeper reclaimed {reclaimed}")
+        return reclaimed
+
+    def start(self) -> None:
+        if self.interval_seconds > 0:
+            self._background.start(lambda: run_periodically(self.sweep_once, self.interval_seconds, "Expiry sweeper"))
+
+    async def stop(self) -> None:
+        await self._background.stop()
+
+    def stats(self) -> dict:
+        return {
+            "running": self._background.running,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "max_batches": self.max_batches,
+            "runs": self.runs,
+            "reclaimed": dict(self.reclaimed),
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+        }
+
+expiry_sweeper = ExpirySweeper(
+    interval_seconds=float(os.environ.get('SWEEPER_INTERVAL_SECONDS', '300')),
+    batch_size=int(os.environ.get('SWEEPER_BATCH_SIZE', '500')),
+    max_batches=int(os.environ.get('SWEEPER_MAX_BATCHES', '20')),
+)
+
+# ============== Session Cache ==============
+
+class SessionCache:
+    """Bounded TTL/LRU cache of resolved users keyed by session token.
+
+    Entries never outlive the session they were resolved from. Each worker
+    holds its own cache; ``invalidate`` drops entries here and upserts a row
+    per user into ``session_cache_invalidations``, which a background poll on
+    every worker applies, so a logout, password reset or role change made
+    through another worker is seen within ``poll_seconds``.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, poll_seconds: float = 1.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: dict = {}
+        self._seen_until: Optional[datetime] = None
+        self._background = BackgroundTask()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.polls = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, session_token: str) -> Optional["User"]:
+        entry = self._entries.get(session_token)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, valid_until = entry
+        if valid_until < time.monotonic():
+            self._remove(session_token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(session_token)
+        self.hits += 1
+        return user
+
+    def set(self, session_token: str, user: "User", session_expires_at: datetime) -> None:
+        if not self.enabled:
+            return
+        remaining = (session_expires_at - datetime.now(timezone.utc)).total_seconds()
+        ttl = min(self.ttl_seconds, remaining)
+        if ttl <= 0:
+            return
+        self._remove(session_token)
+        self._entries[session_token] = (user, time.monotonic() + ttl)
+        self._tokens_by_user.setdefault(user.user_id, set()).add(session_token)
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_token(self, session_token: str) -> None:
+        self._remove(session_token)
+
+    def invalidate_user(self, user_id: str) -> None:
+        for session_token in list(self._tokens_by_user.get(user_id, ())):
+            self._remove(session_token)
+
+    async def invalidate(self, user_ids: List[str], session_token: Optional[str] = None) -> None:
+        """Drop ``session_token`` (or all of the users' tokens) here and the users' entries on every worker."""
+        if session_token is not None:
+            self.invalidate_token(session_token)
+        else:
+            for user_id in user_ids:
+                self.invalidate_user(user_id)
+        if not self.enabled or not user_ids:
+            return
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds + 60)
+        await db.session_cache_invalidations.bulk_write([
+            UpdateOne(
+                {"_id": user_id},
+                {"$set": {"expires_at": expires_at}, "$currentDate": {"invalidated_at": True}},
+                upsert=True,
+            )
+            for user_id in user_ids
+        ], ordered=False)
+
+    async def refresh(self) -> None:
+        query = {}
+        if self._seen_until is not None:
+            # Same overlap as SessionRevocations.refresh; re-dropping is harmless
+            query = {"invalidated_at": {"$gte": self._seen_until - timedelta(seconds=5)}}
+        async for doc in db.session_cache_invalidations.find(query):
+            self.invalidate_user(doc["_id"])
+            self._seen_until = max(self._seen_until or doc["invalidated_at"], doc["invalidated_at"])
+        self.polls += 1
+
+    def start(self) -> None:
+        if self.enabled:
+            self._background.start(lambda: run_periodically(self.refresh, self.poll_seconds, "Session cache poll"))
+
+    async def stop(self) -> None:
+        await self._background.stop()
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "polls": self.polls,
+        }
+
+    def _remove(self, session_token: str) -> None:
+        entry = self._entries.pop(session_token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[0].user_id)
+        if tokens is not None:
+            tokens.discard(session_token)
+            if not tokens:
+                del self._tokens_by_user[entry[0].user_id]
+
+session_cache = SessionCache(
+    max_size=int(os.environ.get('SESSION_CACHE_SIZE', '10000')),
+    ttl_seconds=float(os.environ.get('SESSION_CACHE_TTL_SECONDS', '60')),
+    poll_seconds=float(os.environ.get('SESSION_CACHE_POLL_SECONDS', '1')),
+)
+
+# ============== Signed Session Tokens ==============
+
+# "opaque" cookies are looked up in user_sessions on every request. "signed"
+# cookies are HS256 tokens carrying the session id, user id, role and expiry,
+# so get_current_user can check them without a database read.
+SESSION_TOKEN_MODE = os.environ.get('SESSION_TOKEN_MODE', 'opaque').lower()
+SESSION_SIGNING_KEY = os.environ.get('SESSION_SIGNING_KEY', '')
+SESSION_TOKEN_ALGORITHM = "HS256"
+# Longest session login can create (remember_me); bounds revocation retention.
+SESSION_MAX_LIFETIME = timedelta(days=30)
+
+def epoch_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+def issue_session_token(session: "UserSession", role: str) -> str:
+    """Cookie value for ``session`` in the configured token mode."""
+    if not session_revocations.enabled:
+        return session.session_token
+    import jwt
+    claims = {
+        "sub": session.user_id,
+        "sid": session.session_id,
+        "role": role,
+        "iat_ms": epoch_ms(session.created_at),
+        "exp": session.expires_at,
+    }
+    return jwt.encode(claims, SESSION_SIGNING_KEY, algorithm=SESSION_TOKEN_ALGORITHM)
+
+def decode_session_token(session_token: str) -> Optional[dict]:
+    """Claims of a signed session token, or None if forged, malformed or expired."""
+    import jwt
+    try:
+        return jwt.decode(
+            session_token, SESSION_SIGNING_KEY, algorithms=[SESSION_TOKEN_ALGORITHM],
+            options={"require": ["sub", "sid", "role", "iat_ms", "exp"]},
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+class SessionRevocations:
+    """Revoked signed session tokens, shared between workers.
+
+    Logout revokes a single session id. Password resets and role changes
+    revoke every token a user was issued up to now. Each revocation is
+    upserted into ``session_revocations`` with a server-side ``revoked_at``
+    and a background poll fetches only rows newer than the last one seen, so
+    a token revoked on another worker keeps working for at most
+    ``poll_seconds``. Entries are dropped once every token they cover would
+    have expired anyway, which keeps the set small.
+    """
+
+    def __init__(self, enabled: bool, poll_seconds: float):
+        self.enabled = enabled
+        self.poll_seconds = poll_seconds
+        self._sessions: dict = {}   # session_id -> token expiry
+        self._users: dict = {}      # user_id -> tokens issued at or before this (ms) are revoked
+        self._seen_until: Optional[datetime] = None
+        self._background = BackgroundTask()
+        self.polls = 0
+        self.rejected = 0
+
+    def is_revoked(self, claims: dict) -> bool:
+        revoked = claims["sid"] in self._sessions or claims["iat_ms"] <= self._users.get(claims["sub"], -1)
+        if revoked:
+            self.rejected += 1
+        return revoked
+
+    async def revoke_session(self, session_id: str, expires_at: datetime) -> None:
+        if not self.enabled:
+            return
+        self._sessions[session_id] = expires_at
+        await db.session_revocations.update_one(
+            {"_id": f"session:{session_id}"},
+            {"$set": {"kind": "session", "key": session_id, "expires_at": expires_at},
+             "$currentDate": {"revoked_at": True}},
+            upsert=True,
+        )
+
+    async def revoke_user(self, user_id: str) -> None:
+        await self.revoke_users([user_id])
+
+    async def revoke_users(self, user_ids: List[str]) -> None:
+        """Revoke every token issued so far to each of ``user_ids`` in one round trip."""
+        if not self.enabled or not user_ids:
+            return
+        now = datetime.now(timezone.utc)
+        before_ms = epoch_ms(now)
+        for user_id in user_ids:
+            self._users[user_id] = max(self._users.get(user_id, -1), before_ms)
+        await db.session_revocations.bulk_write([
+            UpdateOne(
+                {"_id": f"user:{user_id}"},
+                {"$set": {"kind": "user", "key": user_id, "expires_at": now + SESSION_MAX_LIFETIME},
+                 "$max": {"before_ms": before_ms},
+                 "$currentDate": {"revoked_at": True}},
+                upsert=True,
+            )
+            for user_id in user_ids
+        ], ordered=False)
+
+    async def refresh(self) -> None:
+        query = {}
+        if self._seen_until is not None:
+            # Writes can commit slightly out of revoked_at order; re-read a
+            # short overlap rather than miss one. Applying a row is idempotent.
+            query = {"revoked_at": {"$gte": self._seen_until - timedelta(seconds=5)}}
+        async for doc in db.session_revocations.find(query).sort("revoked_at", 1):
+            if doc["kind"] == "session":
+                self._sessions[doc["key"]] = parse_datetime(doc["expires_at"])
+            else:
+                self._users[doc["key"]] = max(self._users.get(doc["key"], -1), doc["before_ms"])
+            self._seen_until = max(self._seen_until or doc["revoked_at"], doc["revoked_at"])
+        self._prune()
+        self.polls += 1
+
+    def _prune(self) -> None:
+        now = datetime.now(timezone.utc)
+        self._sessions = {sid: exp for sid, exp in self._sessions.items() if exp > now}
+        oldest_live_ms = epoch_ms(now - SESSION_MAX_LIFETIME)
+        self._users = {uid: ms for uid, ms in self._users.items() if ms >= oldest_live_ms}
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        if not SESSION_SIGNING_KEY:
+            raise RuntimeError("SESSION_TOKEN_MODE=signed requires SESSION_SIGNING_KEY")
+        self._background.start(lambda: run_periodically(self.refresh, self.poll_seconds, "Session revocation poll"))
+
+    async def stop(self) -> None:
+        await self._background.stop()
+
+    def stats(self) -> dict:
+        return {
+            "mode": "signed" if self.enabled else "opaque",
+            "revoked_sessions": len(self._sessions),
+            "revoked_users": len(self._users),
+            "seen_until": self._seen_until.isoformat() if self._seen_until else None,
+            "polls": self.polls,
+            "rejected": self.rejected,
+        }
+
+session_revocations = SessionRevocations(
+    enabled=SESSION_TOKEN_MODE == 'signed',
+    poll_seconds=float(os.environ.get('SESSION_REVOCATION_POLL_SECONDS', '1')),
+)
+
+# ============== Session Activity ==============
+
+class SessionActivity:
+    """Coalesced ``last_seen_at`` tracking for sessions.
+
+    ``touch`` only records the time in memory. Every ``resolution_seconds``
+    the pending touches are written as one unordered ``bulk_write`` of
+    ``$max`` updates, so each session costs at most one write per interval
+    per worker and concurrent workers never move the value backwards.
+    Sessions are keyed by the field that identifies them in the current
+    token mode: ``session_token`` for opaque cookies, ``session_id`` for
+    signed ones. Pending touches are flushed on shutdown.
+    """
+
+    def __init__(self, resolution_seconds: float):
+        self.resolution_seconds = resolution_seconds
+        self._pending: dict = {}       # (field, value) -> last seen
+        self._written: dict = {}       # (field, value) -> monotonic time of the last flushed touch
+        self._lock = asyncio.Lock()
+        self._background = BackgroundTask()
+        self.touches = 0
+        self.flushes = 0
+        self.updates = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.resolution_seconds > 0
+
+    def touch(self, field: str, value: str) -> None:
+        if not self.enabled:
+            return
+        self.touches += 1
+        key = (field, value)
+        written = self._written.get(key)
+        if written is not None and time.monotonic() - written < self.resolution_seconds:
+            return
+        self._pending[key] = datetime.now(timezone.utc)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            now = time.monotonic()
+            ops = [
+                UpdateOne({field: value}, {"$max": {"last_seen_at": seen}})
+                for (field, value), seen in pending.items()
+            ]
+            try:
+                await db.user_sessions.bulk_write(ops, ordered=False)
+            except Exception as e:
+                self.failed += len(ops)
+                logger.error(f"Session activity flush failed for {len(ops)} sessions: {e}")
+                return 0
+            for key in pending:
+                self._written[key] = now
+            # Forget sessions idle for a full interval; their next touch is due anyway
+            self._written = {key: at for key, at in self._written.items() if now - at < self.resolution_seconds}
+            self.flushes += 1
+            self.updates += len(ops)
+            return len(ops)
+
+    def start(self) -> None:
+        if self.enabled:
+            self._background.start(lambda: run_periodically(
+                self.flush, self.resolution_seconds, "Session activity flusher", sleep_first=True,
+            ))
+
+    async def stop(self) -> None:
+        await self._background.stop()
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "resolution_seconds": self.resolution_seconds,
+            "pending": len(self._pending),
+            "touches": self.touches,
+            "flushes": self.flushes,
+            "updates": self.updates,
+            "failed": self.failed,
+        }
+
+session_activity = SessionActivity(
+    resolution_seconds=float(os.environ.get('SESSION_ACTIVITY_RESOLUTION_SECONDS', '60')),
+)
+
+# ============== Password Hashing Pool ==============
+
+def _hash_password_sync(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+def _verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+class HashingPool:
+    """Runs bcrypt off the event loop with a concurrency cap and bounded queue.
+
+    bcrypt releases the GIL, so the thread pool is the default; the process
+    pool is available for hosts where hashing competes with other CPU work.
+    Requests beyond ``max_workers + max_queue`` are rejected with a 503.
+    """
+
+    def __init__(self, kind: str, max_workers: int, max_queue: int):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="Server busy, please retry")
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "busy_workers": min(self.in_flight, self.max_workers),
+            "queued": max(self.in_flight - self.max_workers, 0),
+            "utilisation": round(min(self.in_flight, self.max_workers) / self.max_workers, 4),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+hashing_pool = HashingPool(
+    kind=os.environ.get('HASH_POOL_KIND', 'thread'),
+    max_workers=max(int(os.environ.get('HASH_POOL_WORKERS', str(min(4, os.cpu_count() or 1)))), 1),
+    max_queue=int(os.environ.get('HASH_POOL_MAX_QUEUE', '64')),
+)
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = 10, max_rounds: int = 16, samples: int = 3) -> dict:
+    """Time bcrypt verification on this host at increasing cost factors.
+
+    Each extra round doubles the cost, so timing stops at the first factor
+    over ``target_ms``. The chosen factor is the highest one whose median
+    verify time stays within the target. If even ``min_rounds`` is too
+    slow, ``min_rounds`` is returned with ``within_target`` False.
+    """
+    from passlib.hash import bcrypt
+    secret = "calibration-password"
+    timings = {}
+    chosen = None
+    for rounds in range(min_rounds, max_rounds + 1):
+        hashed = bcrypt.using(rounds=rounds).hash(secret)
+        runs = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.verify(secret, hashed)
+            runs.append((time.perf_counter() - started) * 1000)
+        median = sorted(runs)[len(runs) // 2]
+        timings[rounds] = round(median, 2)
+        if median > target_ms:
+            break
+        chosen = rounds
+    return {
+        "rounds": chosen if chosen is not None else min_rounds,
+        "within_target": chosen is not None,
+        "target_ms": target_ms,
+        "verify_ms": timings,
+    }
+
 # ============== Helper Functions ==============
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await hashing_pool.run(_hash_password_sync, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(_verify_password_sync, plain_password, hashed_password)
 
-async def get_current_user(request: Request) -> Optional[User]:
+async def rehash_password(user_id: str, plain_password: str, old_hash: str) -> None:
+    """Replace a hash made with outdated settings. Runs after the login response is sent."""
+    try:
+        new_hash = await hash_password(plain_password)
+    except HTTPException:
+        # Hashing pool saturated; the next login tries again
+        return
+    # Matching on the old hash leaves a concurrent password reset alone
+    result = await db.users.update_one(
+        {"user_id": user_id, "password_hash": old_hash},
+        {"$set": {"password_hash": new_hash}},
+    )
+    if result.modified_count:
+        logger.info(f"Rehashed password for {user_id}")
+
+async def get_current_user(request: Request, use_cache: bool = True) -> Optional[User]:
     """Get current user from session token in cookie or Authorization header"""
     session_token = request.cookies.get("session_token")
     
@@ -154,43 +2372,67 @@ async def get_current_user(request: Request) -> Optional[User]:
     if not session_token:
         return None
     
-    # Find session
-    session_doc = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
-    if not session_doc:
-        return None
+    claims = None
+    if session_revocations.enabled:
+        # Signature, expiry and revocation are all checked in memory
+        claims = decode_session_token(session_token)
+        if claims is None or session_revocations.is_revoked(claims):
+            return None
     
-    # Check expiry
-    expires_at = session_doc.get("expires_at")
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    if expires_at < datetime.now(timezone.utc):
-        return None
+    if claims is not None:
+        activity_key = ("session_id", claims["sid"])
+    else:
+        activity_key = ("session_token", session_token)
+    
+    cached_user = session_cache.get(session_token) if use_cache else None
+    if cached_user is not None:
+        session_activity.touch(*activity_key)
+        return cached_user
+    
+    if claims is not None:
+        user_id = claims["sub"]
+        expires_at = datetime.fromtimestamp(claims["exp"], timezone.utc)
+    else:
+        # Find session
+        session_doc = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
+        if not session_doc:
+            return None
+        
+        # Check expiry
+        expires_at = parse_datetime(session_doc.get("expires_at"))
+        if expires_at < datetime.now(timezone.utc):
+            return None
+        user_id = session_doc["user_id"]
     
     # Get user
-    user_doc = await db.users.find_one({"user_id": session_doc["user_id"]}, {"_id": 0})
+    user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0})
     if not user_doc:
         return None
+    if claims is not None and user_doc.get("role", "visitor") != claims["role"]:
+        # Role changed after the token was issued; the revocation may not
+        # have reached this worker yet
+        return None
     
     # Convert datetime fields
-    if isinstance(user_doc.get('created_at'), str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    if isinstance(user_doc.get('updated_at'), str):
-        user_doc['updated_at'] = datetime.fromisoformat(user_doc['updated_at'])
+    normalize_datetimes(user_doc, 'created_at', 'updated_at')
     
-    return User(**user_doc)
+    user = User(**user_doc)
+    session_cache.set(session_token, user, expires_at)
+    session_activity.touch(*activity_key)
+    return user
 
-async def require_auth(request: Request) -> User:
+async def require_auth(request: Request, use_cache: bool = True) -> User:
     """Require authenticated user"""
-    user = await get_current_user(request)
+    user = await get_current_user(request, use_cache)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return user
 
 async def require_admin(request: Request) -> User:
     """Require admin user"""
-    user = await require_auth(request)
+    # Never from the session cache: a demotion or logout on another worker
+    # must take effect before the next admin request, not after a poll
+    user = await require_auth(request, use_cache=False)
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
@@ -200,37 +2442,33 @@ async def require_admin(request: Request) -> User:
 @api_router.post("/auth/register")
 async def register(request: RegisterRequest, response: Response):
     """Register a new user with email/password"""
-    # Check if user exists
-    existing = await db.users.find_one({"email": request.email}, {"_id": 0})
-    if existing:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Create user
     user = User(
         email=request.email,
         name=request.name,
-        password_hash=hash_password(request.password),
+        password_hash=await hash_password(request.password),
         auth_provider="email",
         role="visitor"
     )
     
-    # Save to DB
+    # Save to DB; the unique email index rejects existing accounts atomically
     doc = user.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['updated_at'] = doc['updated_at'].isoformat()
-    await db.users.insert_one(doc)
+    try:
+        await db.users.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    dashboard_stats.user_added(user.role, user.auth_provider, user.created_at)
+    await change_versions.bump("users")
     
     # Create session
     session = UserSession(user_id=user.user_id)
     session_doc = session.model_dump()
-    session_doc['expires_at'] = session_doc['expires_at'].isoformat()
-    session_doc['created_at'] = session_doc['created_at'].isoformat()
     await db.user_sessions.insert_one(session_doc)
     
     # Set cookie
     response.set_cookie(
         key="session_token",
-        value=session.session_token,
+        value=issue_session_token(session, user.role),
         httponly=True,
         secure=True,
         samesite="none",
@@ -240,19 +2478,10 @@ async def register(request: RegisterRequest, response: Response):
     
     logger.info(f"New user registered: {request.email}")
     
-    return UserResponse(
-        user_id=user.user_id,
-        email=user.email,
-        name=user.name,
-        picture=user.picture,
-        role=user.role,
-        auth_provider=user.auth_provider,
-        preferences=user.preferences,
-        created_at=user.created_at
-    )
+    return user_response(user)
 
 @api_router.post("/auth/login")
-async def login(request: LoginRequest, response: Response):
+async def login(request: LoginRequest, response: Response, background_tasks: BackgroundTasks):
     """Login with email/password"""
     # Find user
     user_doc = await db.users.find_one({"email": request.email}, {"_id": 0})
@@ -264,14 +2493,13 @@ async def login(request: LoginRequest, response: Response):
         raise HTTPException(status_code=400, detail="Please login with Google")
     
     # Verify password
-    if not user_doc.get("password_hash") or not verify_password(request.password, user_doc["password_hash"]):
+    if not user_doc.get("password_hash") or not await verify_password(request.password, user_doc["password_hash"]):
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if get_pwd_context().needs_update(user_doc["password_hash"]):
+        background_tasks.add_task(rehash_password, user_doc["user_id"], request.password, user_doc["password_hash"])
     
     # Convert datetime fields
-    if isinstance(user_doc.get('created_at'), str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    if isinstance(user_doc.get('updated_at'), str):
-        user_doc['updated_at'] = datetime.fromisoformat(user_doc['updated_at'])
+    normalize_datetimes(user_doc, 'created_at', 'updated_at')
     
     user = User(**user_doc)
     
@@ -283,14 +2511,12 @@ async def login(request: LoginRequest, response: Response):
         expires_at=datetime.now(timezone.utc) + timedelta(days=expires_days)
     )
     session_doc = session.model_dump()
-    session_doc['expires_at'] = session_doc['expires_at'].isoformat()
-    session_doc['created_at'] = session_doc['created_at'].isoformat()
     await db.user_sessions.insert_one(session_doc)
     
     # Set cookie
     response.set_cookie(
         key="session_token",
-        value=session.session_token,
+        value=issue_session_token(session, user.role),
         httponly=True,
         secure=True,
         samesite="none",
@@ -300,89 +2526,121 @@ async def login(request: LoginRequest, response: Response):
     
     logger.info(f"User logged in: {request.email}")
     
-    return UserResponse(
-        user_id=user.user_id,
-        email=user.email,
-        name=user.name,
-        picture=user.picture,
-        role=user.role,
-        auth_provider=user.auth_provider,
-        preferences=user.preferences,
-        created_at=user.created_at
+    return user_response(user)
+
+async def upsert_oauth_user(auth_data: dict):
+    """Create or refresh the user for an OAuth login. Returns ``(user_doc, created)``."""
+    now = datetime.now(timezone.utc)
+    new_user = User(
+        email=auth_data["email"],
+        name=auth_data["name"],
+        picture=auth_data.get("picture"),
+        auth_provider="google",
+        role="visitor",
+        created_at=now,
+        updated_at=now,
     )
+    on_insert = new_user.model_dump(exclude={"name", "picture", "updated_at"})
+    update = {
+        "$set": {"name": new_user.name, "picture": new_user.picture, "updated_at": now},
+        "$setOnInsert": on_insert,
+    }
+    for attempt in range(2):
+        try:
+            user_doc = await db.users.find_one_and_update(
+                {"email": auth_data["email"]}, update,
+                projection={"_id": 0}, upsert=True, return_document=ReturnDocument.AFTER,
+            )
+            return user_doc, user_doc["user_id"] == new_user.user_id
+        except DuplicateKeyError:
+            # Two first logins for the same email raced; the retry matches the winner
+            if attempt:
+                raise
 
-@api_router.post("/auth/session")
-async def process_oauth_session(request: Request, response: Response):
-    """Process OAuth session from Emergent Auth"""
-    body = await request.json()
-    session_id = body.get("session_id")
-    
-    if not session_id:
-        raise HTTPException(status_code=400, detail="Session ID required")
+async def exchange_oauth_session(session_id: str) -> dict:
+    """Exchange an OAuth session_id for an app session. Returns the cookie value and user body."""
+    if not oauth_breaker.allow():
+        raise HTTPException(
+            status_code=503,
+            detail="Authentication provider unavailable, please retry shortly",
+            headers={"Retry-After": str(int(oauth_breaker.retry_after()) + 1)},
+        )
     
     # Exchange session_id for user data from Emergent Auth
+    import httpx
+    started = time.perf_counter()
     try:
-        async with httpx.AsyncClient() as client:
-            auth_response = await client.get(
-                "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-                headers={"X-Session-ID": session_id}
-            )
-            
-            if auth_response.status_code != 200:
-                raise HTTPException(status_code=401, detail="Invalid session")
-            
-            auth_data = auth_response.json()
+        auth_response = await get_auth_http_client().get(
+            OAUTH_SESSION_DATA_PATH,
+            headers={"X-Session-ID": session_id}
+        )
+        oauth_upstream_latency.record(time.perf_counter() - started, error=auth_response.status_code >= 500)
+        if auth_response.status_code >= 500:
+            oauth_breaker.record_failure()
+        else:
+            oauth_breaker.record_success()
+        
+        if auth_response.status_code != 200:
+            raise HTTPException(status_code=401, detail="Invalid session")
+        
+        auth_data = auth_response.json()
+    except HTTPException:
+        raise
+    except httpx.TimeoutException as e:
+        oauth_upstream_latency.record(time.perf_counter() - started, error=True)
+        oauth_breaker.record_failure()
+        logger.error(f"OAuth session timeout: {e!r}")
+        raise HTTPException(status_code=504, detail="Authentication provider timed out")
     except Exception as e:
+        oauth_upstream_latency.record(time.perf_counter() - started, error=True)
+        oauth_breaker.record_failure()
         logger.error(f"OAuth session error: {e}")
         raise HTTPException(status_code=500, detail="Authentication failed")
     
-    # Check if user exists
-    existing_user = await db.users.find_one({"email": auth_data["email"]}, {"_id": 0})
-    
-    if existing_user:
-        # Update existing user
-        await db.users.update_one(
-            {"email": auth_data["email"]},
-            {"$set": {
-                "name": auth_data["name"],
-                "picture": auth_data.get("picture"),
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            }}
-        )
-        user_id = existing_user["user_id"]
-        role = existing_user.get("role", "visitor")
-        preferences = existing_user.get("preferences", {})
-        created_at = existing_user.get("created_at", datetime.now(timezone.utc).isoformat())
-    else:
-        # Create new user
-        user = User(
-            email=auth_data["email"],
-            name=auth_data["name"],
-            picture=auth_data.get("picture"),
-            auth_provider="google",
-            role="visitor"
-        )
-        doc = user.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        doc['updated_at'] = doc['updated_at'].isoformat()
-        await db.users.insert_one(doc)
-        user_id = user.user_id
-        role = user.role
-        preferences = user.preferences
-        created_at = doc['created_at']
+    # Create or update the user in one round trip
+    user_doc, created = await upsert_oauth_user(auth_data)
+    await change_versions.bump("users")
+    if created:
+        dashboard_stats.user_added(user_doc["role"], user_doc["auth_provider"], parse_datetime(user_doc["created_at"]))
         logger.info(f"New Google user: {auth_data['email']}")
+    role = user_doc.get("role", "visitor")
+    created_at = parse_datetime(user_doc.get("created_at")) or datetime.now(timezone.utc)
     
     # Create session
-    session = UserSession(user_id=user_id)
+    session = UserSession(user_id=user_doc["user_id"])
     session_doc = session.model_dump()
-    session_doc['expires_at'] = session_doc['expires_at'].isoformat()
-    session_doc['created_at'] = session_doc['created_at'].isoformat()
     await db.user_sessions.insert_one(session_doc)
     
+    return {
+        "session_token": issue_session_token(session, role),
+        "user": {
+            "user_id": user_doc["user_id"],
+            "email": auth_data["email"],
+            "name": auth_data["name"],
+            "picture": auth_data.get("picture"),
+            "role": role,
+            "auth_provider": "google",
+            "preferences": user_doc.get("preferences", {}),
+            "created_at": created_at.isoformat()
+        },
+    }
+
+@api_router.post("/auth/session")
+async def process_oauth_session(request: Request, response: Response):
+    """Process OAuth session from Emergent Auth"""
+    body = await request.json()
+    session_id = body.get("session_id")
+    
+    if not session_id:
+        raise HTTPException(status_code=400, detail="Session ID required")
+    
+    # Repeat posts of one session_id share a single exchange and app session
+    result = await oauth_exchanges.run(session_id, lambda: exchange_oauth_session(session_id))
+    
     # Set cookie
     response.set_cookie(
         key="session_token",
-        value=session.session_token,
+        value=result["session_token"],
         httponly=True,
         secure=True,
         samesite="none",
@@ -390,44 +2648,38 @@ async def process_oauth_session(request: Request, response: Response):
         path="/"
     )
     
-    if isinstance(created_at, str):
-        created_at = datetime.fromisoformat(created_at)
-    
-    return {
-        "user_id": user_id,
-        "email": auth_data["email"],
-        "name": auth_data["name"],
-        "picture": auth_data.get("picture"),
-        "role": role,
-        "auth_provider": "google",
-        "preferences": preferences,
-        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at
-    }
+    return result["user"]
 
 @api_router.get("/auth/me")
-async def get_current_user_info(request: Request):
+async def get_current_user_info(request: Request, response: Response):
     """Get current authenticated user"""
     user = await get_current_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
+    cached = not_modified(request, response, ["users"], user.user_id)
+    if cached is not None:
+        return cached
     
-    return UserResponse(
-        user_id=user.user_id,
-        email=user.email,
-        name=user.name,
-        picture=user.picture,
-        role=user.role,
-        auth_provider=user.auth_provider,
-        preferences=user.preferences,
-        created_at=user.created_at
-    )
+    return user_response(user)
 
 @api_router.post("/auth/logout")
 async def logout(request: Request, response: Response):
     """Logout user"""
     session_token = request.cookies.get("session_token")
     if session_token:
-        await db.user_sessions.delete_one({"session_token": session_token})
+        claims = decode_session_token(session_token) if session_revocations.enabled else None
+        if claims is not None:
+            await db.user_sessions.delete_one({"session_id": claims["sid"]})
+            await session_revocations.revoke_session(
+                claims["sid"], datetime.fromtimestamp(claims["exp"], timezone.utc)
+            )
+            user_ids = [claims["sub"]]
+        else:
+            session_doc = await db.user_sessions.find_one_and_delete(
+                {"session_token": session_token}, projection={"_id": 0, "user_id": 1}
+            )
+            user_ids = [session_doc["user_id"]] if session_doc else []
+        await session_cache.invalidate(user_ids, session_token)
     
     response.delete_cookie(key="session_token", path="/")
     return {"message": "Logged out successfully"}
@@ -447,8 +2699,6 @@ async def request_password_reset(request: PasswordResetRequest):
     # Create reset token
     token = PasswordResetToken(user_id=user_doc["user_id"])
     token_doc = token.model_dump()
-    token_doc['expires_at'] = token_doc['expires_at'].isoformat()
-    token_doc['created_at'] = token_doc['created_at'].isoformat()
     await db.password_reset_tokens.insert_one(token_doc)
     
     # In production, send email with reset link
@@ -460,39 +2710,38 @@ async def request_password_reset(request: PasswordResetRequest):
 @api_router.post("/auth/password-reset-confirm")
 async def confirm_password_reset(request: PasswordResetConfirm):
     """Confirm password reset with token"""
-    # Find token
-    token_doc = await db.password_reset_tokens.find_one(
-        {"token": request.token, "used": False},
-        {"_id": 0}
+    # Consume the token: only one request can flip an unexpired token to used.
+    # The string bound matches ISO timestamps not yet migrated (see ExpirySweeper).
+    now = datetime.now(timezone.utc)
+    token_doc = await db.password_reset_tokens.find_one_and_update(
+        {"token": request.token, "used": False, "$or": [
+            {"expires_at": {"$gt": now}},
+            {"expires_at": {"$gt": now.isoformat()}},
+        ]},
+        {"$set": {"used": True}},
+        projection={"_id": 0, "user_id": 1},
     )
     
     if not token_doc:
         raise HTTPException(status_code=400, detail="Invalid or expired reset token")
     
-    # Check expiry
-    expires_at = token_doc.get("expires_at")
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    if expires_at < datetime.now(timezone.utc):
-        raise HTTPException(status_code=400, detail="Reset token has expired")
-    
     # Update password
-    new_hash = hash_password(request.new_password)
+    try:
+        new_hash = await hash_password(request.new_password)
+    except HTTPException:
+        # Hashing pool saturated: hand the token back so the user can retry
+        await db.password_reset_tokens.update_one({"token": request.token}, {"$set": {"used": False}})
+        raise
     await db.users.update_one(
         {"user_id": token_doc["user_id"]},
-        {"$set": {"password_hash": new_hash, "updated_at": datetime.now(timezone.utc).isoformat()}}
-    )
-    
-    # Mark token as used
-    await db.password_reset_tokens.update_one(
-        {"token": request.token},
-        {"$set": {"used": True}}
+        {"$set": {"password_hash": new_hash, "updated_at": datetime.now(timezone.utc)}}
     )
     
     # Invalidate all sessions for this user
     await db.user_sessions.delete_many({"user_id": token_doc["user_id"]})
+    await session_revocations.revoke_user(token_doc["user_id"])
+    await session_cache.invalidate([token_doc["user_id"]])
+    await change_versions.bump("users")
     
     return {"message": "Password reset successfully"}
 
@@ -503,24 +2752,171 @@ async def update_preferences(request: Request, prefs: UpdatePreferencesRequest):
     
     await db.users.update_one(
         {"user_id": user.user_id},
-        {"$set": {"preferences": prefs.preferences, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"preferences": prefs.preferences, "updated_at": datetime.now(timezone.utc)}}
     )
+    await session_cache.invalidate([user.user_id])
+    await change_versions.bump("users")
     
     return {"message": "Preferences updated", "preferences": prefs.preferences}
 
 # ============== Admin Routes ==============
 
+@api_router.get("/admin/stats")
+async def admin_get_stats(request: Request):
+    """Dashboard counts and daily histograms for contacts and users (admin only)"""
+    await require_admin(request)
+    return await dashboard_stats.get()
+
 @api_router.get("/admin/contacts", response_model=List[ContactSubmission])
-async def admin_get_contacts(request: Request):
-    """Get all contact submissions (admin only)"""
+async def admin_get_contacts(
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    read: Optional[bool] = None,
+):
+    """Get a page of contact submissions, newest first (admin only)"""
     await require_admin(request)
+    cached = reporting_not_modified(request, response, ["contact_submissions"])
+    if cached is not None:
+        return cached
     
-    submissions = await db.contact_submissions.find({}, {"_id": 0}).to_list(1000)
+    query = {} if read is None else {"read": read}
+    submissions, next_cursor, total = await paginate(
+        reporting_db.contact_submissions, query, {"_id": 0}, "created_at", "id", limit, cursor, order
+    )
     for sub in submissions:
-        if isinstance(sub.get('created_at'), str):
-            sub['created_at'] = datetime.fromisoformat(sub['created_at'])
+        normalize_datetimes(sub, 'created_at')
     
-    return submissions
+    set_page_headers(response, next_cursor, total)
+    return list_response("admin_get_contacts", response, submissions, ContactSubmission)
+
+@api_router.get("/admin/contacts/search")
+async def admin_search_contacts(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    read: Optional[bool] = None,
+):
+    """Search contact submissions by name, email, subject and message (admin only)"""
+    await require_admin(request)
+    
+    submissions, next_cursor, total = await search_contacts(q, limit, cursor, read)
+    for sub in submissions:
+        normalize_datetimes(sub, 'created_at')
+    
+    set_page_headers(response, next_cursor, total)
+    return list_response("admin_search_contacts", response, submissions)
+
+@api_router.post("/admin/contacts/bulk")
+async def admin_bulk_contacts(bulk: BulkContactRequest, request: Request):
+    """Mark read/unread or delete many contact submissions at once (admin only)"""
+    await require_admin(request)
+    
+    if (bulk.ids is None) == (bulk.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either ids or filter")
+    
+    update = None
+    if bulk.action != "delete":
+        update = {"$set": {"read": bulk.action == "mark_read"}}
+    
+    if bulk.filter is not None:
+        query = date_range_query("created_at", None, bulk.filter.before)
+        if bulk.filter.read is not None:
+            query["read"] = bulk.filter.read
+        if not query:
+            raise HTTPException(status_code=400, detail="Filter must set read or before")
+        op = DeleteMany(query) if update is None else UpdateMany(query, update)
+        result = await db.contact_submissions.bulk_write([op])
+        affected = result.deleted_count if update is None else result.modified_count
+        if affected:
+            dashboard_stats.invalidate()
+            await change_versions.bump("contact_submissions")
+            contact_feed.publish("resync", {})
+        matched = affected if update is None else result.matched_count
+        return {"action": bulk.action, "matched": matched, "affected": affected}
+    
+    ids = list(dict.fromkeys(bulk.ids))
+    existing = {
+        doc["id"]: doc for doc in await db.contact_submissions.find(
+            {"id": {"$in": ids}}, {"_id": 0, "id": 1, "read": 1, "created_at": 1}
+        ).to_list(len(ids))
+    }
+    results = []
+    ops = []
+    for contact_id in ids:
+        doc = existing.get(contact_id)
+        if doc is None:
+            results.append({"id": contact_id, "status": "not_found"})
+        elif update is None:
+            ops.append(DeleteOne({"id": contact_id}))
+            results.append({"id": contact_id, "status": "deleted"})
+        elif doc.get("read", False) == update["$set"]["read"]:
+            results.append({"id": contact_id, "status": "unchanged"})
+        else:
+            ops.append(UpdateOne({"id": contact_id}, update))
+            results.append({"id": contact_id, "status": "updated"})
+    
+    if ops:
+        await db.contact_submissions.bulk_write(ops, ordered=False)
+        for item in results:
+            doc = existing.get(item["id"])
+            if item["status"] == "deleted":
+                dashboard_stats.contact_deleted(doc.get("read", False), doc.get("created_at"))
+                contact_feed.publish("deleted", {"id": item["id"]})
+            elif item["status"] == "updated":
+                dashboard_stats.contact_read_changed(update["$set"]["read"])
+                contact_feed.publish("updated", {"id": item["id"], "read": update["$set"]["read"]})
+        await change_versions.bump("contact_submissions")
+    
+    return {"action": bulk.action, "affected": len(ops), "results": results}
+
+@api_router.get("/admin/contacts/stream")
+async def admin_contacts_stream(request: Request):
+    """Server-Sent Events feed of created/updated/deleted contacts (admin only)"""
+    await require_admin(request)
+    if contact_feed.full:
+        raise HTTPException(status_code=503, detail="Too many live feed clients")
+    
+    async def events():
+        # Subscribing here rather than in the route means the finally below
+        # always runs for a subscriber that exists
+        try:
+            subscriber = contact_feed.subscribe()
+        except HTTPException:
+            return
+        event_id = 0
+        recheck_at = time.monotonic() + SSE_HEARTBEAT_SECONDS
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                if time.monotonic() >= recheck_at:
+                    # A logout, demotion, password reset or revocation ends the feed
+                    try:
+                        await require_admin(request)
+                    except HTTPException:
+                        return
+                    recheck_at = time.monotonic() + SSE_HEARTBEAT_SECONDS
+                try:
+                    event, data = await asyncio.wait_for(subscriber.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event == "resync":
+                    subscriber.lagged = False
+                event_id += 1
+                yield format_sse(event, data, event_id)
+        finally:
+            contact_feed.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @api_router.put("/admin/contacts/{contact_id}")
 async def admin_update_contact(contact_id: str, update: UpdateContactStatusRequest, request: Request):
@@ -534,6 +2930,10 @@ async def admin_update_contact(contact_id: str, update: UpdateContactStatusReque
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Contact not found")
+    if result.modified_count:
+        dashboard_stats.contact_read_changed(update.read)
+        await change_versions.bump("contact_submissions")
+        contact_feed.publish("updated", {"id": contact_id, "read": update.read})
     
     return {"message": "Contact updated"}
 
@@ -542,26 +2942,88 @@ async def admin_delete_contact(contact_id: str, request: Request):
     """Delete contact submission (admin only)"""
     await require_admin(request)
     
-    result = await db.contact_submissions.delete_one({"id": contact_id})
+    deleted = await db.contact_submissions.find_one_and_delete(
+        {"id": contact_id}, {"_id": 0, "read": 1, "created_at": 1}
+    )
     
-    if result.deleted_count == 0:
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Contact not found")
+    dashboard_stats.contact_deleted(deleted.get("read", False), deleted.get("created_at"))
+    await change_versions.bump("contact_submissions")
+    contact_feed.publish("deleted", {"id": contact_id})
     
     return {"message": "Contact deleted"}
 
 @api_router.get("/admin/users")
-async def admin_get_users(request: Request):
-    """Get all users (admin only)"""
+async def admin_get_users(
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    role: Optional[str] = None,
+    auth_provider: Optional[str] = None,
+):
+    """Get a page of users, newest first (admin only)"""
     await require_admin(request)
+    cached = reporting_not_modified(request, response, ["users"])
+    if cached is not None:
+        return cached
     
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
+    query = {}
+    if role is not None:
+        query["role"] = role
+    if auth_provider is not None:
+        query["auth_provider"] = auth_provider
+    users, next_cursor, total = await paginate(
+        reporting_db.users, query, {"_id": 0, "password_hash": 0}, "created_at", "user_id", limit, cursor, order
+    )
     for user in users:
-        if isinstance(user.get('created_at'), str):
-            user['created_at'] = datetime.fromisoformat(user['created_at'])
-        if isinstance(user.get('updated_at'), str):
-            user['updated_at'] = datetime.fromisoformat(user['updated_at'])
+        normalize_datetimes(user, 'created_at', 'updated_at')
+    
+    set_page_headers(response, next_cursor, total)
+    return list_response("admin_get_users", response, users)
+
+@api_router.get("/admin/export/contacts")
+async def admin_export_contacts(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    read: Optional[bool] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Stream all contact submissions as NDJSON or CSV (admin only)"""
+    await require_admin(request)
     
-    return users
+    query = date_range_query("created_at", since, until)
+    if read is not None:
+        query["read"] = read
+    return export_response(
+        stream_export(reporting_db.contact_submissions, query, CONTACT_EXPORT_FIELDS, format, "created_at"),
+        format, "contacts",
+    )
+
+@api_router.get("/admin/export/users")
+async def admin_export_users(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    role: Optional[str] = None,
+    auth_provider: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Stream all users as NDJSON or CSV, without password hashes (admin only)"""
+    await require_admin(request)
+    
+    query = date_range_query("created_at", since, until)
+    if role is not None:
+        query["role"] = role
+    if auth_provider is not None:
+        query["auth_provider"] = auth_provider
+    return export_response(
+        stream_export(reporting_db.users, query, USER_EXPORT_FIELDS, format, "created_at"),
+        format, "users",
+    )
 
 @api_router.put("/admin/users/{user_id}/role")
 async def admin_update_user_role(user_id: str, request: Request):
@@ -580,11 +3042,205 @@ async def admin_update_user_role(user_id: str, request: Request):
     
     await db.users.update_one(
         {"user_id": user_id},
-        {"$set": {"role": new_role, "updated_at": datetime.now(timezone.utc).isoformat()}}
+        {"$set": {"role": new_role, "updated_at": datetime.now(timezone.utc)}}
     )
+    if session_revocations.enabled:
+        # Signed tokens carry the old role, so they all stop working
+        await db.user_sessions.delete_many({"user_id": user_id})
+        await session_revocations.revoke_user(user_id)
+    await session_cache.invalidate([user_id])
+    dashboard_stats.user_role_changed(user_doc.get("role", "visitor"), new_role)
+    await change_versions.bump("users")
     
     return {"message": f"User role updated to {new_role}", "new_role": new_role}
 
+@api_router.post("/admin/users/bulk-role")
+async def admin_bulk_update_user_roles(bulk: BulkUserRoleRequest, request: Request):
+    """Set the role of many users at once (admin only)"""
+    admin = await require_admin(request)
+    
+    user_ids = list(dict.fromkeys(bulk.user_ids))
+    existing = {
+        doc["user_id"]: doc for doc in await db.users.find(
+            {"user_id": {"$in": user_ids}}, {"_id": 0, "user_id": 1, "role": 1}
+        ).to_list(len(user_ids))
+    }
+    results = []
+    ops = []
+    now = datetime.now(timezone.utc)
+    for user_id in user_ids:
+        doc = existing.get(user_id)
+        if user_id == admin.user_id:
+            # Same rule as admin_update_user_role: no self-demotion
+            results.append({"user_id": user_id, "status": "rejected", "detail": "Cannot change your own role"})
+        elif doc is None:
+            results.append({"user_id": user_id, "status": "not_found"})
+        elif doc.get("role", "visitor") == bulk.role:
+            results.append({"user_id": user_id, "status": "unchanged"})
+        else:
+            ops.append(UpdateOne({"user_id": user_id}, {"$set": {"role": bulk.role, "updated_at": now}}))
+            results.append({"user_id": user_id, "status": "updated"})
+    
+    if ops:
+        await db.users.bulk_write(ops, ordered=False)
+        updated = [item["user_id"] for item in results if item["status"] == "updated"]
+        if session_revocations.enabled:
+            # Signed tokens carry the old role, so they all stop working
+            await db.user_sessions.delete_many({"user_id": {"$in": updated}})
+            await session_revocations.revoke_users(updated)
+        await session_cache.invalidate(updated)
+        for item in results:
+            if item["status"] == "updated":
+                dashboard_stats.user_role_changed(existing[item["user_id"]].get("role", "visitor"), bulk.role)
+        await change_versions.bump("users")
+    
+    return {"role": bulk.role, "affected": len(ops), "results": results}
+
+@api_router.get("/admin/sessions")
+async def admin_get_active_sessions(
+    request: Request,
+    active_within: int = Query(900, ge=60, le=30 * 24 * 60 * 60),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+):
+    """Users with sessions seen in the last ``active_within`` seconds, most recent first (admin only)"""
+    await require_admin(request)
+    since = datetime.now(timezone.utc) - timedelta(seconds=active_within)
+    rows = await db.user_sessions.aggregate([
+        {"$match": {"last_seen_at": {"$gte": since}, "expires_at": {"$gt": datetime.now(timezone.utc)}}},
+        {"$group": {"_id": "$user_id", "active_sessions": {"$sum": 1}, "last_seen_at": {"$max": "$last_seen_at"}}},
+        {"$sort": {"last_seen_at": -1}},
+        {"$limit": limit},
+    ]).to_list(limit)
+    users = {
+        doc["user_id"]: doc for doc in await db.users.find(
+            {"user_id": {"$in": [row["_id"] for row in rows]}}, {"_id": 0, "user_id": 1, "email": 1, "name": 1, "role": 1}
+        ).to_list(len(rows))
+    }
+    return [
+        {
+            "user_id": row["_id"],
+            "email": users.get(row["_id"], {}).get("email"),
+            "name": users.get(row["_id"], {}).get("name"),
+            "role": users.get(row["_id"], {}).get("role"),
+            "active_sessions": row["active_sessions"],
+            "last_seen_at": row["last_seen_at"],
+        }
+        for row in rows
+    ]
+
+@api_router.get("/admin/users/{user_id}/sessions")
+async def admin_get_user_sessions(
+    user_id: str,
+    request: Request,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+):
+    """Sessions of one user, most recently seen first; never-seen sessions last (admin only)"""
+    await require_admin(request)
+    query = {"user_id": user_id}
+    sessions = await db.user_sessions.find(query, {"_id": 0, "session_token": 0}) \
+        .sort([("last_seen_at", -1), ("created_at", -1)]) \
+        .limit(limit).to_list(limit)
+    for session in sessions:
+        normalize_datetimes(session, 'created_at', 'expires_at', 'last_seen_at')
+    set_page_headers(response, None, await db.user_sessions.count_documents(query))
+    return sessions
+
+@api_router.delete("/admin/users/{user_id}/sessions/{session_id}")
+async def admin_revoke_user_session(user_id: str, session_id: str, request: Request):
+    """Revoke one session of a user (admin only)"""
+    await require_admin(request)
+    session_doc = await db.user_sessions.find_one_and_delete(
+        {"session_id": session_id, "user_id": user_id}, projection={"_id": 0}
+    )
+    if not session_doc:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await session_cache.invalidate([user_id], session_doc["session_token"])
+    await session_revocations.revoke_session(session_id, parse_datetime(session_doc["expires_at"]))
+    return {"message": "Session revoked"}
+
+@api_router.delete("/admin/users/{user_id}/sessions")
+async def admin_revoke_user_sessions(user_id: str, request: Request):
+    """Revoke every session of a user (admin only)"""
+    await require_admin(request)
+    result = await db.user_sessions.delete_many({"user_id": user_id})
+    await session_revocations.revoke_user(user_id)
+    await session_cache.invalidate([user_id])
+    return {"message": "Sessions revoked", "revoked": result.deleted_count}
+
+@api_router.get("/admin/session-activity")
+async def admin_session_activity_stats(request: Request):
+    """Last-seen tracking touches and flushes (admin only)"""
+    await require_admin(request)
+    return session_activity.stats()
+
+@api_router.get("/admin/session-cache")
+async def admin_session_cache_stats(request: Request):
+    """Session cache hit/miss counters for sizing (admin only)"""
+    await require_admin(request)
+    return session_cache.stats()
+
+@api_router.get("/admin/session-revocations")
+async def admin_session_revocation_stats(request: Request):
+    """Signed-token revocation set size and poll state (admin only)"""
+    await require_admin(request)
+    return session_revocations.stats()
+
+@api_router.get("/admin/hashing-pool")
+async def admin_hashing_pool_stats(request: Request):
+    """Password hashing pool utilisation (admin only)"""
+    await require_admin(request)
+    return hashing_pool.stats()
+
+@api_router.get("/admin/sweeper")
+async def admin_sweeper_stats(request: Request):
+    """Expiry sweeper runs and rows reclaimed (admin only)"""
+    await require_admin(request)
+    return expiry_sweeper.stats()
+
+@api_router.get("/admin/oauth-upstream")
+async def admin_oauth_upstream_stats(request: Request):
+    """Latency of the OAuth provider session exchange (admin only)"""
+    await require_admin(request)
+    return {
+        "provider_url": OAUTH_PROVIDER_URL,
+        **oauth_upstream_latency.stats(),
+        "breaker": oauth_breaker.stats(),
+        "session_exchange": oauth_exchanges.stats(),
+    }
+
+@api_router.get("/admin/query-profile")
+async def admin_query_profile(
+    request: Request,
+    limit: int = Query(20, ge=1, le=500),
+    sort: str = Query("total_ms", pattern="^(total_ms|count|max_ms|mean_ms)$"),
+):
+    """Top query shapes by total time (admin only, requires QUERY_PROFILER=1)"""
+    await require_admin(request)
+    if query_profiler is None:
+        raise HTTPException(status_code=404, detail="Query profiler is disabled")
+    return {
+        "slow_threshold_ms": query_profiler.slow_threshold_ms,
+        "slow_commands": query_profiler.slow_commands,
+        "dropped_shapes": query_profiler.dropped_shapes,
+        "shapes": query_profiler.top(limit, sort),
+    }
+
+@api_router.delete("/admin/query-profile")
+async def admin_reset_query_profile(request: Request):
+    """Clear collected query shapes (admin only)"""
+    await require_admin(request)
+    if query_profiler is None:
+        raise HTTPException(status_code=404, detail="Query profiler is disabled")
+    query_profiler.reset()
+    return {"message": "Query profile reset"}
+
+@api_router.get("/admin/write-behind")
+async def admin_write_behind_stats(request: Request):
+    """Write-behind batch sizes and flush latency (admin only)"""
+    await require_admin(request)
+    return [buffer.stats() for buffer in write_behind_buffers]
+
 # ============== Public Routes ==============
 
 @api_router.get("/")
@@ -596,17 +3252,29 @@ async def create_status_check(input: StatusCheckCreate):
     status_dict = input.model_dump()
     status_obj = StatusCheck(**status_dict)
     doc = status_obj.model_dump()
-    doc['timestamp'] = doc['timestamp'].isoformat()
-    await db.status_checks.insert_one(doc)
+    await status_check_writer.insert(doc)
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find({}, {"_id": 0}).to_list(1000)
+async def get_status_checks(
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+):
+    status_checks, next_cursor, total = await paginate(
+        reporting_db.status_checks, {}, {"_id": 0}, "timestamp", "id", limit, cursor, order
+    )
     for check in status_checks:
-        if isinstance(check['timestamp'], str):
-            check['timestamp'] = datetime.fromisoformat(check['timestamp'])
-    return status_checks
+        normalize_datetimes(check, 'timestamp')
+    set_page_headers(response, next_cursor, total)
+    return list_response("get_status_checks", response, status_checks, StatusCheck)
+
+def contacts_written(docs: List[dict]) -> None:
+    """Counters and live feed events for contacts once they are in the database."""
+    for doc in docs:
+        dashboard_stats.contact_added(doc["created_at"])
+        contact_feed.publish("created", {key: value for key, value in doc.items() if key != "_id"})
 
 @api_router.post("/contact", response_model=ContactSubmission)
 async def submit_contact_form(contact: ContactSubmissionCreate):
@@ -614,8 +3282,7 @@ async def submit_contact_form(contact: ContactSubmissionCreate):
     try:
         contact_obj = ContactSubmission(**contact.model_dump())
         doc = contact_obj.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        await db.contact_submissions.insert_one(doc)
+        await contact_writer.insert(doc)
         logger.info(f"New contact submission from {contact.email}")
         return contact_obj
     except Exception as e:
@@ -623,17 +3290,60 @@ async def submit_contact_form(contact: ContactSubmissionCreate):
         raise HTTPException(status_code=500, detail="Failed to save contact submission")
 
 @api_router.get("/contact", response_model=List[ContactSubmission])
-async def get_contact_submissions():
-    """Get all contact submissions"""
-    submissions = await db.contact_submissions.find({}, {"_id": 0}).to_list(1000)
+async def get_contact_submissions(
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    read: Optional[bool] = None,
+):
+    """Get a page of contact submissions, newest first"""
+    query = {} if read is None else {"read": read}
+    submissions, next_cursor, total = await paginate(
+        reporting_db.contact_submissions, query, {"_id": 0}, "created_at", "id", limit, cursor, order
+    )
     for sub in submissions:
-        if isinstance(sub['created_at'], str):
-            sub['created_at'] = datetime.fromisoformat(sub['created_at'])
-    return submissions
+        normalize_datetimes(sub, 'created_at')
+    set_page_headers(response, next_cursor, total)
+    return list_response("get_contact_submissions", response, submissions, ContactSubmission)
 
 # Include router
 app.include_router(api_router)
 
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+def component_metrics() -> List[str]:
+    """Gauges read from the in-process caches, pools and buffers."""
+    cache = session_cache.stats()
+    pool = hashing_pool.stats()
+    lines = [
+        "# TYPE session_cache_hits_total counter", f"session_cache_hits_total {cache['hits']}",
+        "# TYPE session_cache_misses_total counter", f"session_cache_misses_total {cache['misses']}",
+        "# TYPE session_cache_size gauge", f"session_cache_size {cache['size']}",
+        "# TYPE hashing_pool_in_flight gauge", f"hashing_pool_in_flight {pool['in_flight']}",
+        "# TYPE hashing_pool_rejected_total counter", f"hashing_pool_rejected_total {pool['rejected']}",
+        "# TYPE expiry_sweeper_reclaimed_total counter",
+    ]
+    for name, count in expiry_sweeper.reclaimed.items():
+        lines.append(f'expiry_sweeper_reclaimed_total{{collection="{name}"}} {count}')
+    lines.append("# TYPE write_behind_pending gauge")
+    for buffer in write_behind_buffers:
+        lines.append(f'write_behind_pending{{collection="{buffer.collection_name}"}} {len(buffer._pending)}')
+    return lines
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of request, Mongo and component metrics"""
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    lines = []
+    for metric in (http_requests_total, http_request_duration, http_requests_in_flight,
+                   http_request_db_round_trips, mongo_command_duration, mongo_command_failures,
+                   mongo_pool_wait, mongo_pool_checkout_failures, mongo_pool_checked_out):
+        lines.extend(metric.render())
+    lines.extend(component_metrics())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
 # CORS middleware - when using credentials, must specify exact origins (not *)
 # For production, the preview URL will be allowed. For local dev, localhost is included.
 ALLOWED_ORIGINS = [
@@ -648,8 +3358,6 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Load testing harness for the Kumar Abhinav Portfolio API.
+
+Drives backend/server.py at fixed concurrency, either in-process through an
+ASGI transport (default) or against a running server (--base-url), and
+reports RPS and p50/p95/p99 latency per route as JSON for regression
+comparison.
+
+MongoDB (--mongo): "memory" (default for in-process runs) serves the app
+from an in-memory mongomock-motor database, so no server is needed; it
+measures the API layer, not MongoDB. "mongod" starts a throwaway mongod on a
+free port with a temporary dbpath and removes it afterwards. "url" uses
+MONGO_URL and fails within a few seconds if it is unreachable. In-process
+runs use a dedicated database that is dropped afterwards. With --base-url
+the harness seeds fixtures (and promotes its admin) in the server's own
+DB_NAME, which is never dropped; every user, session and contact it created
+there is deleted when the run ends. Fixture accounts use a random per-run
+password.
+
+Examples:
+    python backend_loadtest.py --scenario all --duration 15
+    python backend_loadtest.py --mongo mongod --scenario login_storm --concurrency 32 -o run.json
+    python backend_loadtest.py --scenario auth_me --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent / "backend"
+PASSWORD = secrets.token_urlsafe(16)
+SCENARIOS = ["login_storm", "admin_polling", "contact_spam", "auth_me"]
+# Fail fast instead of pymongo's 30s default when MONGO_URL is unreachable
+SERVER_SELECTION_TIMEOUT_MS = 3000
+
+
+# ============== Mongo stand-in ==============
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalMongod:
+    """Throwaway mongod bound to localhost with a temporary dbpath."""
+
+    def __init__(self):
+        self.port = _free_port()
+        self.dbpath = tempfile.mkdtemp(prefix="loadtest-mongo-")
+        self.process = None
+
+    @property
+    def url(self):
+        return f"mongodb://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        binary = shutil.which("mongod")
+        if not binary:
+            raise SystemExit("--mongo mongod requested but no mongod binary on PATH")
+        self.process = subprocess.Popen(
+            [binary, "--port", str(self.port), "--bind_ip", "127.0.0.1", "--dbpath", self.dbpath, "--quiet"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            with socket.socket() as sock:
+                if sock.connect_ex(("127.0.0.1", self.port)) == 0:
+                    return self
+            time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise SystemExit("mongod did not start within 30s")
+
+    def __exit__(self, *exc):
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.dbpath, ignore_errors=True)
+
+
+# ============== Measurement ==============
+
+class RouteStats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, ok):
+        self.latencies[route].append(seconds)
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self, elapsed):
+        out = {}
+        for route, samples in sorted(self.latencies.items()):
+            ordered = sorted(samples)
+
+            def pct(q):
+                return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+            out[route] = {
+                "requests": len(ordered),
+                "errors": self.errors[route],
+                "rps": round(len(ordered) / elapsed, 1),
+                "p50_ms": pct(0.50),
+                "p95_ms": pct(0.95),
+                "p99_ms": pct(0.99),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return out
+
+
+async def timed(stats, client, route, method, url, **kwargs):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except httpx.HTTPError:
+        response, ok = None, False
+    stats.record(route, time.perf_counter() - started, ok)
+    return response
+
+
+# ============== Fixtures ==============
+
+async def register_user(client, email):
+    response = await client.post("/api/auth/register", json={"email": email, "password": PASSWORD, "name": "Load Test"})
+    response.raise_for_status()
+    return response.cookies.get("session_token"), response.json()["user_id"]
+
+
+def fixture_email_pattern(tag):
+    return f"^load-{tag}-"
+
+
+async def setup_fixtures(client, database, users, tag):
+    """Register ``users`` visitors plus one admin and seed some contacts.
+
+    Every email starts with ``load-<tag>-`` so cleanup_fixtures can find them.
+    """
+    emails = [f"load-{tag}-{i}@example.com" for i in range(users)]
+    tokens = []
+    for email in emails:
+        token, _ = await register_user(client, email)
+        tokens.append(token)
+    admin_email = f"load-{tag}-admin@example.com"
+    _, admin_id = await register_user(client, admin_email)
+    await database.users.update_one({"user_id": admin_id}, {"$set": {"role": "admin"}})
+    # A signed session token carries the role it was issued with; log in
+    # again so the admin scenarios are not measuring 401s
+    response = await client.post("/api/auth/login", json={"email": admin_email, "password": PASSWORD})
+    response.raise_for_status()
+    admin_token = response.cookies.get("session_token")
+    for i in range(200):
+        await client.post("/api/contact", json={
+            "name": f"Seed {i}", "email": f"load-{tag}-seed{i}@example.com", "message": "seed message",
+        })
+    return {"tag": tag, "emails": emails, "tokens": tokens, "admin_token": admin_token}
+
+
+async def cleanup_fixtures(database, tag):
+    """Delete the users, sessions and contacts a run created in a shared database."""
+    pattern = {"$regex": fixture_email_pattern(tag)}
+    user_ids = [doc["user_id"] async for doc in database.users.find({"email": pattern}, {"user_id": 1})]
+    await database.user_sessions.delete_many({"user_id": {"$in": user_ids}})
+    await database.password_reset_tokens.delete_many({"user_id": {"$in": user_ids}})
+    await database.users.delete_many({"user_id": {"$in": user_ids}})
+    contacts = await database.contact_submissions.delete_many({"email": pattern})
+    print(f"cleaned up {len(user_ids)} users and {contacts.deleted_count} contacts", file=sys.stderr)
+
+
+# ============== Scenarios ==============
+
+def scenario_request(name, fixtures, i):
+    """Return (route, method, url, kwargs) for the i-th request of a scenario."""
+    if name == "login_storm":
+        email = fixtures["emails"][i % len(fixtures["emails"])]
+        return "POST /api/auth/login", "POST", "/api/auth/login", {"json": {"email": email, "password": PASSWORD}}
+    if name == "admin_polling":
+        headers = {"Authorization": f"Bearer {fixtures['admin_token']}"}
+        if i % 2:
+            return "GET /api/admin/users", "GET", "/api/admin/users", {"headers": headers}
+        return "GET /api/admin/contacts", "GET", "/api/admin/contacts", {"headers": headers}
+    if name == "contact_spam":
+        return "POST /api/contact", "POST", "/api/contact", {"json": {
+            "name": "Spam Bot", "email": f"load-{fixtures['tag']}-spam{i}@example.com", "subject": "offer", "message": "buy now " * 20,
+        }}
+    if name == "auth_me":
+        token = fixtures["tokens"][i % len(fixtures["tokens"])]
+        return "GET /api/auth/me", "GET", "/api/auth/me", {"headers": {"Authorization": f"Bearer {token}"}}
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+async def run_scenario(client, name, fixtures, concurrency, duration, requests_per_worker):
+    stats = RouteStats()
+    deadline = time.perf_counter() + duration
+    counter = iter(range(sys.maxsize))
+
+    async def worker():
+        done = 0
+        while time.perf_counter() < deadline and (not requests_per_worker or done < requests_per_worker):
+            route, method, url, kwargs = scenario_request(name, fixtures, next(counter))
+            await timed(stats, client, route, method, url, **kwargs)
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"concurrency": concurrency, "elapsed_s": round(elapsed, 2), "routes": stats.report(elapsed)}
+
+
+# ============== Comparison ==============
+
+def compare(baseline, current, tolerance):
+    """Return human-readable regressions where p95 grew beyond ``tolerance``."""
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        base_routes = baseline.get("scenarios", {}).get(scenario, {}).get("routes", {})
+        for route, row in result["routes"].items():
+            base = base_routes.get(route)
+            if not base or not base["p95_ms"]:
+                continue
+            ratio = row["p95_ms"] / base["p95_ms"]
+            if ratio > 1 + tolerance:
+                regressions.append(f"{scenario} {route}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms (x{ratio:.2f})")
+    return regressions
+
+
+# ============== Main ==============
+
+def open_client(mongo_url):
+    """Motor client for ``mongo_url``, or an in-memory one when it is None."""
+    if mongo_url is None:
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient(tz_aware=True)
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(mongo_url, tz_aware=True, serverSelectionTimeoutMS=SERVER_SELECTION_TIMEOUT_MS)
+
+
+async def main(args, mongo_url):
+    if args.base_url:
+        args.db_name = args.db_name or os.environ["DB_NAME"]
+    else:
+        args.db_name = args.db_name or f"loadtest_{uuid.uuid4().hex[:8]}"
+    os.environ["MONGO_URL"] = mongo_url or "mongodb://in-memory"
+    os.environ["DB_NAME"] = args.db_name
+    os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", str(SERVER_SELECTION_TIMEOUT_MS))
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    setup_client = open_client(mongo_url)
+    database = setup_client[args.db_name]
+    if mongo_url is not None:
+        from pymongo.errors import ServerSelectionTimeoutError
+        try:
+            await database.command("ping")
+        except ServerSelectionTimeoutError:
+            setup_client.close()
+            raise SystemExit(f"MongoDB at {mongo_url} is unreachable; use --mongo memory or --mongo mongod")
+    scenarios = SCENARIOS if args.scenario == "all" else [args.scenario]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    tag = uuid.uuid4().hex[:8]
+
+    async def drive(client):
+        fixtures = await setup_fixtures(client, database, args.users, tag)
+        results = {}
+        for name in scenarios:
+            print(f"running {name} (concurrency={args.concurrency}, duration={args.duration}s)", file=sys.stderr)
+            results[name] = await run_scenario(
+                client, name, fixtures, args.concurrency, args.duration, args.requests_per_worker
+            )
+        return results
+
+    try:
+        if args.base_url:
+            async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+                results = await drive(client)
+        else:
+            import server
+            if mongo_url is None:
+                # init_mongo keeps an existing client, so the app uses this one
+                server.client = setup_client
+                server.db = server.reporting_db = database
+            transport = httpx.ASGITransport(app=server.app)
+            async with server.app.router.lifespan_context(server.app):
+                async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client:
+                    results = await drive(client)
+    finally:
+        if args.base_url:
+            # Let a write-behind server flush its buffered contacts first
+            await asyncio.sleep(1)
+            await cleanup_fixtures(database, tag)
+        elif not args.keep_db:
+            await setup_client.drop_database(args.db_name)
+        setup_client.close()
+
+    return {
+        "target": args.base_url or "in-process",
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "scenarios": results,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS + ["all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--requests-per-worker", type=int, default=0, help="Stop each worker after N requests (0 = no cap)")
+    parser.add_argument("--users", type=int, default=20, help="Visitor accounts to register for login/auth scenarios")
+    parser.add_argument("--base-url", help="Target a running server (e.g. http://127.0.0.1:8001) instead of in-process")
+    parser.add_argument("--mongo", choices=["memory", "mongod", "url"],
+                        help="Database for the run: in-memory (default in-process), a throwaway mongod, or MONGO_URL "
+                             "(default with --base-url)")
+    parser.add_argument("--db-name", help="Database to use (defaults to a throwaway name, or DB_NAME with --base-url)")
+    parser.add_argument("--keep-db", action="store_true", help="Do not drop the load test database afterwards")
+    parser.add_argument("-o", "--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare p95 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 growth before failing (0.2 = 20%%)")
+    return parser
+
+
+if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    args.mongo = args.mongo or ("url" if args.base_url else "memory")
+    if args.base_url and args.mongo == "memory":
+        parser.error("--base-url needs the server's database: use --mongo url")
+    if args.mongo == "mongod":
+        with LocalMongod() as mongod:
+            report = asyncio.run(main(args, mongod.url))
+    elif args.mongo == "url":
+        report = asyncio.run(main(args, os.environ.get("MONGO_URL", "mongodb://localhost:27017")))
+    else:
+        report = asyncio.run(main(args, None))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -20,12 +20,41 @@ import { Button } from '../components/ui/button';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '../components/ui/tabs';
 
 const API_URL = process.env.REACT_APP_BACKEND_URL;
+const PAGE_SIZE = 50;
+
+// One page of a list endpoint; nextCursor is null on the last page
+const fetchPage = async (path, cursor = null) => {
+  const response = await axios.get(`${API_URL}${path}`, {
+    params: { limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+    withCredentials: true
+  });
+  return { items: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
+// Append a page, skipping rows already shown (e.g. pushed live over SSE)
+const appendPage = (prev, items, key) => {
+  const seen = new Set(prev.map(item => item[key]));
+  return [...prev, ...items.filter(item => !seen.has(item[key]))];
+};
+
+const LoadMoreButton = ({ onClick, loading }) => (
+  <div className="flex justify-center mt-6">
+    <Button variant="outline" onClick={onClick} disabled={loading}>
+      {loading && <Loader2 size={16} className="mr-2 animate-spin" />}
+      Load more
+    </Button>
+  </div>
+);
 
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const { user, isAdmin, loading: authLoading, logout } = useAuth();
   const [contacts, setContacts] = useState([]);
+  const [contactsCursor, setContactsCursor] = useState(null);
   const [users, setUsers] = useState([]);
+  const [usersCursor, setUsersCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(null);
+  const [stats, setStats] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [activeTab, setActiveTab] = useState('contacts');
@@ -37,12 +66,12 @@ const AdminDashboard = () => {
     }
   }, [authLoading, user, isAdmin, navigate]);
 
+  // Reload the first page only; older rows come in through "Load more"
   const fetchContacts = useCallback(async () => {
     try {
-      const response = await axios.get(`${API_URL}/api/admin/contacts`, {
-        withCredentials: true
-      });
-      setContacts(response.data);
+      const { items, nextCursor } = await fetchPage('/api/admin/contacts');
+      setContacts(items);
+      setContactsCursor(nextCursor);
     } catch (err) {
       console.error('Error fetching contacts:', err);
       if (err.response?.status === 403) {
@@ -55,24 +84,88 @@ const AdminDashboard = () => {
 
   const fetchUsers = useCallback(async () => {
     try {
-      const response = await axios.get(`${API_URL}/api/admin/users`, {
+      const { items, nextCursor } = await fetchPage('/api/admin/users');
+      setUsers(items);
+      setUsersCursor(nextCursor);
+    } catch (err) {
+      console.error('Error fetching users:', err);
+    }
+  }, []);
+
+  const loadMoreContacts = async () => {
+    setLoadingMore('contacts');
+    try {
+      const { items, nextCursor } = await fetchPage('/api/admin/contacts', contactsCursor);
+      setContacts(prev => appendPage(prev, items, 'id'));
+      setContactsCursor(nextCursor);
+    } catch (err) {
+      console.error('Error fetching contacts:', err);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const loadMoreUsers = async () => {
+    setLoadingMore('users');
+    try {
+      const { items, nextCursor } = await fetchPage('/api/admin/users', usersCursor);
+      setUsers(prev => appendPage(prev, items, 'user_id'));
+      setUsersCursor(nextCursor);
+    } catch (err) {
+      console.error('Error fetching users:', err);
+    } finally {
+      setLoadingMore(null);
+    }
+  };
+
+  const fetchStats = useCallback(async () => {
+    try {
+      const response = await axios.get(`${API_URL}/api/admin/stats`, {
         withCredentials: true
       });
-      setUsers(response.data);
+      setStats(response.data);
     } catch (err) {
-      console.error('Error fetching users:', err);
+      console.error('Error fetching stats:', err);
     }
   }, []);
 
   useEffect(() => {
     if (isAdmin) {
       let isMounted = true;
-      Promise.all([fetchContacts(), fetchUsers()]).finally(() => {
+      Promise.all([fetchStats(), fetchContacts(), fetchUsers()]).finally(() => {
         if (isMounted) setLoading(false);
       });
       return () => { isMounted = false; };
     }
-  }, [isAdmin, fetchContacts, fetchUsers]);
+  }, [isAdmin, fetchStats, fetchContacts, fetchUsers]);
+
+  // Live updates pushed by the server instead of re-polling the contact list
+  useEffect(() => {
+    if (!isAdmin) return undefined;
+    const source = new EventSource(`${API_URL}/api/admin/contacts/stream`, {
+      withCredentials: true
+    });
+    source.addEventListener('created', (event) => {
+      const contact = JSON.parse(event.data);
+      setContacts(prev => (prev.some(c => c.id === contact.id) ? prev : [contact, ...prev]));
+      fetchStats();
+    });
+    source.addEventListener('updated', (event) => {
+      const update = JSON.parse(event.data);
+      setContacts(prev => prev.map(c => (c.id === update.id ? { ...c, ...update } : c)));
+      fetchStats();
+    });
+    source.addEventListener('deleted', (event) => {
+      const { id } = JSON.parse(event.data);
+      setContacts(prev => prev.filter(c => c.id !== id));
+      fetchStats();
+    });
+    source.addEventListener('resync', () => {
+      fetchContacts();
+      fetchStats();
+    });
+    return () => source.close();
+  }, [isAdmin, fetchContacts, fetchStats]);
 
   const handleMarkAsRead = async (contactId, currentStatus) => {
     try {
@@ -84,6 +177,7 @@ const AdminDashboard = () => {
       setContacts(prev =>
         prev.map(c => (c.id === contactId ? { ...c, read: !currentStatus } : c))
       );
+      fetchStats();
     } catch (err) {
       console.error('Error updating contact:', err);
     }
@@ -96,6 +190,7 @@ const AdminDashboard = () => {
         withCredentials: true
       });
       setContacts(prev => prev.filter(c => c.id !== contactId));
+      fetchStats();
     } catch (err) {
       console.error('Error deleting contact:', err);
     }
@@ -121,7 +216,7 @@ const AdminDashboard = () => {
   const handleRefresh = () => {
     setLoading(true);
     setError(null);
-    Promise.all([fetchContacts(), fetchUsers()]).finally(() => setLoading(false));
+    Promise.all([fetchStats(), fetchContacts(), fetchUsers()]).finally(() => setLoading(false));
   };
 
   const handleLogout = async () => {
@@ -142,7 +237,10 @@ const AdminDashboard = () => {
 
   if (!isAdmin) return null;
 
-  const unreadCount = contacts.filter(c => !c.read).length;
+  // Totals come from /api/admin/stats; the lists only hold the pages loaded so far
+  const totalMessages = stats?.contacts.total ?? '–';
+  const unreadCount = stats?.contacts.unread ?? 0;
+  const totalUsers = stats?.users.total ?? '–';
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-slate-50 to-blue-50">
@@ -194,7 +292,7 @@ const AdminDashboard = () => {
               </div>
               <div>
                 <p className="text-sm text-slate-500">Total Messages</p>
-                <p className="text-2xl font-bold text-slate-900">{contacts.length}</p>
+                <p className="text-2xl font-bold text-slate-900">{totalMessages}</p>
               </div>
             </div>
           </div>
@@ -216,7 +314,7 @@ const AdminDashboard = () => {
               </div>
               <div>
                 <p className="text-sm text-slate-500">Total Users</p>
-                <p className="text-2xl font-bold text-slate-900">{users.length}</p>
+                <p className="text-2xl font-bold text-slate-900">{totalUsers}</p>
               </div>
             </div>
           </div>
@@ -308,6 +406,9 @@ const AdminDashboard = () => {
                     </div>
                   </div>
                 ))}
+                {contactsCursor && (
+                  <LoadMoreButton onClick={loadMoreContacts} loading={loadingMore === 'contacts'} />
+                )}
               </div>
             )}
           </TabsContent>
@@ -392,6 +493,9 @@ const AdminDashboard = () => {
                     ))}
                   </tbody>
                 </table>
+                {usersCursor && (
+                  <LoadMoreButton onClick={loadMoreUsers} loading={loadingMore === 'users'} />
+                )}
               </div>
             )}
           </TabsContent>
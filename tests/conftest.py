@@ -0,0 +1,81 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# server reads these when the worker starts; tests swap in their own database
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "portfolio_test")
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """An in-memory Motor-compatible database installed as server.db."""
+    from mongomock_motor import AsyncMongoMockClient
+
+    database = AsyncMongoMockClient(tz_aware=True)["portfolio_test"]
+    monkeypatch.setattr(server, "db", database)
+    monkeypatch.setattr(server, "reporting_db", database)
+    return database
+
+
+@pytest.fixture
+def client(mock_db, monkeypatch):
+    """The ASGI app over the in-memory database, with indexes and cheap bcrypt."""
+    import asyncio
+
+    from fastapi.testclient import TestClient
+    from passlib.context import CryptContext
+
+    monkeypatch.setattr(server, "_pwd_context", CryptContext(schemes=["bcrypt"], bcrypt__rounds=4))
+    monkeypatch.setattr(server.change_versions, "shared", False)
+    server.session_cache.clear()
+    asyncio.run(server.ensure_indexes(mock_db))
+    # No lifespan: background tasks stay off and init_mongo is never called.
+    # https so the Secure session cookie is sent back.
+    return TestClient(server.app, base_url="https://testserver")
+
+
+class CountingCollection:
+    """Records each driver operation (one round trip) issued on a collection."""
+
+    OPERATIONS = {
+        "find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "delete_one",
+        "delete_many", "find_one_and_update", "find_one_and_delete", "bulk_write", "aggregate",
+        "count_documents",
+    }
+
+    def __init__(self, collection, log):
+        self._collection = collection
+        self._log = log
+
+    def __getattr__(self, name):
+        if name in self.OPERATIONS:
+            self._log.append((self._collection.name, name))
+        return getattr(self._collection, name)
+
+
+class CountingDatabase:
+    def __init__(self, database):
+        self._database = database
+        self.log = []
+
+    def __getattr__(self, name):
+        return CountingCollection(self._database[name], self.log)
+
+    __getitem__ = __getattr__
+
+
+@pytest.fixture
+def round_trips(client, mock_db, monkeypatch):
+    # The client fixture keeps change versions in-process; with the shared
+    # default every bump adds one find_one_and_update on change_versions.
+    counting = CountingDatabase(mock_db)
+    monkeypatch.setattr(server, "db", counting)
+    return counting.log
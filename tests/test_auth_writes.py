@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+
+
+def test_register_rejects_an_existing_email(client):
+    body = {"email": "taken@example.com", "password": "password123", "name": "Test"}
+    assert client.post("/api/auth/register", json=body).status_code == 200
+
+    response = client.post("/api/auth/register", json=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+def test_startup_fails_when_email_unique_cannot_be_built():
+    database = AsyncMongoMockClient(tz_aware=True)["duplicates"]
+
+    async def scenario():
+        await database.users.insert_many([{"email": "dup@example.com"}, {"email": "dup@example.com"}])
+        await server.ensure_indexes(database)
+
+    with pytest.raises(RuntimeError, match="users.email_unique"):
+        asyncio.run(scenario())
+
+
+def reset_token(mock_db, expires_at):
+    asyncio.run(mock_db.users.insert_one({
+        "user_id": "user_1", "email": "reset@example.com", "name": "Reset", "auth_provider": "email",
+        "role": "visitor", "password_hash": "x", "preferences": {},
+        "created_at": datetime.now(timezone.utc), "updated_at": datetime.now(timezone.utc),
+    }))
+    asyncio.run(mock_db.password_reset_tokens.insert_one({
+        "token": "tok", "user_id": "user_1", "used": False, "expires_at": expires_at,
+    }))
+
+
+@pytest.mark.parametrize("expires_at", [
+    datetime.now(timezone.utc) + timedelta(hours=1),
+    (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat(),
+], ids=["datetime", "iso-string"])
+def test_password_reset_accepts_both_timestamp_formats(client, mock_db, expires_at):
+    reset_token(mock_db, expires_at)
+
+    response = client.post("/api/auth/password-reset-confirm", json={"token": "tok", "new_password": "newpass123"})
+
+    assert response.status_code == 200, response.text
+    assert asyncio.run(mock_db.password_reset_tokens.find_one({"token": "tok"}))["used"] is True
+
+
+@pytest.mark.parametrize("expires_at", [
+    datetime.now(timezone.utc) - timedelta(hours=1),
+    (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat(),
+], ids=["datetime", "iso-string"])
+def test_password_reset_rejects_expired_tokens(client, mock_db, expires_at):
+    reset_token(mock_db, expires_at)
+
+    response = client.post("/api/auth/password-reset-confirm", json={"token": "tok", "new_password": "newpass123"})
+
+    assert response.status_code == 400
+
+
+def test_reset_token_can_only_be_used_once(client, mock_db):
+    reset_token(mock_db, datetime.now(timezone.utc) + timedelta(hours=1))
+    body = {"token": "tok", "new_password": "newpass123"}
+
+    assert client.post("/api/auth/password-reset-confirm", json=body).status_code == 200
+    assert client.post("/api/auth/password-reset-confirm", json=body).status_code == 400
+
+
+# ============== Round trips per route ==============
+
+def test_register_round_trips(client, round_trips):
+    response = client.post("/api/auth/register", json={
+        "email": "new@example.com", "password": "password123", "name": "New",
+    })
+
+    assert response.status_code == 200
+    assert round_trips == [("users", "insert_one"), ("user_sessions", "insert_one")]
+
+
+def test_oauth_session_round_trips(client, round_trips, monkeypatch):
+    import httpx
+
+    def provider(request):
+        return httpx.Response(200, json={"email": "g@example.com", "name": "Google User", "picture": None})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(provider), base_url="https://provider")
+    monkeypatch.setattr(server, "get_auth_http_client", lambda: upstream)
+    monkeypatch.setattr(server, "oauth_exchanges", server.SingleFlightCache(ttl_seconds=0, max_size=10))
+
+    response = client.post("/api/auth/session", json={"session_id": "sess-1"})
+
+    assert response.status_code == 200, response.text
+    assert round_trips == [("users", "find_one_and_update"), ("user_sessions", "insert_one")]
+
+
+def test_password_reset_confirm_round_trips(client, mock_db, round_trips):
+    reset_token(mock_db, datetime.now(timezone.utc) + timedelta(hours=1))
+
+    response = client.post("/api/auth/password-reset-confirm", json={"token": "tok", "new_password": "newpass123"})
+
+    assert response.status_code == 200
+    assert round_trips == [
+        ("password_reset_tokens", "find_one_and_update"),
+        ("users", "update_one"),
+        ("user_sessions", "delete_many"),
+        ("session_cache_invalidations", "bulk_write"),
+    ]
@@ -0,0 +1,42 @@
+import asyncio
+
+import server
+
+
+def test_background_task_keeps_running_after_errors_and_stops_cleanly():
+    calls = []
+
+    async def tick():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    async def run():
+        task = server.BackgroundTask()
+        task.start(lambda: server.run_periodically(tick, 0, "Test ticker"))
+        task.start(lambda: server.run_periodically(tick, 0, "Test ticker"))
+        while len(calls) < 3:
+            await asyncio.sleep(0)
+        assert task.running
+        await task.stop()
+        await task.stop()
+        return task.running
+
+    assert asyncio.run(run()) is False
+    assert len(calls) >= 3
+
+
+def test_sleep_first_waits_before_the_first_call():
+    calls = []
+
+    async def tick():
+        calls.append(1)
+
+    async def run():
+        task = server.BackgroundTask()
+        task.start(lambda: server.run_periodically(tick, 60, "Test ticker", sleep_first=True))
+        await asyncio.sleep(0.01)
+        await task.stop()
+
+    asyncio.run(run())
+    assert calls == []
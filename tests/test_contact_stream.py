@@ -0,0 +1,62 @@
+import asyncio
+
+from starlette.requests import Request
+
+import server
+
+
+def admin_token(client, mock_db):
+    response = client.post("/api/auth/register", json={"email": "admin@example.com", "password": "password123", "name": "Admin"})
+    assert response.status_code == 200, response.text
+    asyncio.run(mock_db.users.update_one({"user_id": response.json()["user_id"]}, {"$set": {"role": "admin"}}))
+    client.cookies.clear()
+    return response.cookies["session_token"]
+
+
+def stream_request(token):
+    async def receive():
+        await asyncio.Event().wait()
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/api/admin/contacts/stream",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    }
+    return Request(scope, receive)
+
+
+def test_feed_closes_once_the_admin_session_is_gone(client, mock_db, monkeypatch):
+    token = admin_token(client, mock_db)
+    monkeypatch.setattr(server, "SSE_HEARTBEAT_SECONDS", 0.01)
+
+    async def run():
+        response = await server.admin_contacts_stream(stream_request(token))
+        body = response.body_iterator
+        assert await body.__anext__() == "retry: 5000\n\n"
+        assert await body.__anext__() == ": keepalive\n\n"
+        assert len(server.contact_feed._subscribers) == 1
+
+        await mock_db.user_sessions.delete_many({})
+        server.session_cache.clear()
+        chunks = []
+        async for chunk in body:
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert set(chunks) <= {": keepalive\n\n"}
+    assert server.contact_feed._subscribers == set()
+
+
+def test_feed_that_is_never_read_holds_no_subscriber_slot(client, mock_db):
+    token = admin_token(client, mock_db)
+
+    async def run():
+        return await server.admin_contacts_stream(stream_request(token))
+
+    asyncio.run(run())
+
+    assert server.contact_feed._subscribers == set()
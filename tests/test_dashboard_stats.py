@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def stats(mock_db, monkeypatch):
+    monkeypatch.setattr(server, "change_versions", server.ChangeVersions(shared=False, poll_seconds=1))
+    dashboard = server.DashboardStats(refresh_seconds=300, days=30)
+    computes = []
+    compute = dashboard.compute
+
+    async def counted():
+        computes.append(1)
+        return await compute()
+
+    dashboard.compute = counted
+    dashboard.computes = computes
+    return dashboard
+
+
+def contact(read=False):
+    return {"id": server.uuid.uuid4().hex, "read": read, "created_at": datetime.now(timezone.utc)}
+
+
+def test_local_writes_apply_deltas_without_recomputing(stats, mock_db):
+    async def run():
+        await stats.get()
+        await mock_db.contact_submissions.insert_one(contact())
+        stats.contact_added(datetime.now(timezone.utc))
+        await server.change_versions.bump("contact_submissions")
+        return await stats.get()
+
+    result = asyncio.run(run())
+
+    assert result["contacts"]["total"] == 1
+    assert len(stats.computes) == 1
+
+
+def test_another_workers_write_triggers_a_recompute(stats, mock_db):
+    async def run():
+        await stats.get()
+        await mock_db.contact_submissions.insert_many([contact(), contact(read=True)])
+        # What the change-version poll records for a bump made elsewhere
+        server.change_versions._versions["contact_submissions"] = 1
+        return await stats.get()
+
+    result = asyncio.run(run())
+
+    assert result["contacts"]["total"] == 2
+    assert result["contacts"]["unread"] == 1
+    assert len(stats.computes) == 2
@@ -0,0 +1,51 @@
+import asyncio
+
+import server
+
+
+def admin_client(client, mock_db):
+    response = client.post("/api/auth/register", json={"email": "admin@example.com", "password": "password123", "name": "Admin"})
+    asyncio.run(mock_db.users.update_one({"user_id": response.json()["user_id"]}, {"$set": {"role": "admin"}}))
+    return client
+
+
+def submit_contact(client, name):
+    response = client.post("/api/contact", json={"name": name, "email": f"{name}@example.com", "message": "Hello there"})
+    assert response.status_code == 200, response.text
+
+
+def test_unchanged_list_revalidates_with_304(client, mock_db):
+    admin = admin_client(client, mock_db)
+    submit_contact(admin, "first")
+
+    first = admin.get("/api/admin/contacts")
+    etag = first.headers["ETag"]
+    again = admin.get("/api/admin/contacts", headers={"If-None-Match": etag})
+
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_write_changes_the_etag(client, mock_db):
+    admin = admin_client(client, mock_db)
+    submit_contact(admin, "first")
+    etag = admin.get("/api/admin/contacts").headers["ETag"]
+
+    submit_contact(admin, "second")
+    response = admin.get("/api/admin/contacts", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+
+def test_no_etags_while_reporting_reads_a_secondary(client, mock_db, monkeypatch):
+    monkeypatch.setattr(server, "REPORTING_ETAGS", False)
+    admin = admin_client(client, mock_db)
+    submit_contact(admin, "first")
+
+    response = admin.get("/api/admin/users", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(server.time, "monotonic", clock)
+    return clock
+
+
+# ============== CircuitBreaker ==============
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = server.CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow() and breaker.state == "closed"
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert breaker.retry_after() == 30
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = server.CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+
+def test_breaker_lets_one_trial_through_after_reset(clock):
+    breaker = server.CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Other callers keep failing fast while the trial is out
+    assert not breaker.allow()
+
+
+def test_successful_trial_closes_the_breaker(clock):
+    breaker = server.CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = server.CircuitBreaker(failure_threshold=5, reset_seconds=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.opened == 2
+    assert not breaker.allow()
+
+
+def test_zero_threshold_disables_the_breaker(clock):
+    breaker = server.CircuitBreaker(failure_threshold=0, reset_seconds=30)
+    for _ in range(10):
+        breaker.record_failure()
+
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+# ============== SingleFlightCache ==============
+
+def test_concurrent_calls_share_one_execution():
+    cache = server.SingleFlightCache(ttl_seconds=60, max_size=10)
+    calls = []
+
+    async def exchange():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"session_token": "t"}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.run("sid", exchange) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_result_is_reused_until_ttl_expires(clock):
+    cache = server.SingleFlightCache(ttl_seconds=60, max_size=10)
+    calls = []
+
+    async def exchange():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        first = await cache.run("sid", exchange)
+        clock.now += 59
+        second = await cache.run("sid", exchange)
+        clock.now += 2
+        third = await cache.run("sid", exchange)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (1, 1, 2)
+    assert cache.cache_hits == 1
+
+
+def test_errors_are_shared_but_never_cached():
+    cache = server.SingleFlightCache(ttl_seconds=60, max_size=10)
+    attempts = []
+
+    async def exchange():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise server.HTTPException(status_code=504, detail="timeout")
+        return "ok"
+
+    async def scenario():
+        first = await asyncio.gather(*(cache.run("sid", exchange) for _ in range(3)), return_exceptions=True)
+        return first, await cache.run("sid", exchange)
+
+    first, retry = asyncio.run(scenario())
+
+    assert all(isinstance(result, server.HTTPException) for result in first)
+    assert retry == "ok"
+    assert len(attempts) == 2
+
+
+def test_cache_is_bounded():
+    cache = server.SingleFlightCache(ttl_seconds=60, max_size=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await cache.run(key, lambda: asyncio.sleep(0, result=key))
+
+    asyncio.run(scenario())
+
+    assert list(cache._results) == ["b", "c"]
+
+
+# ============== Route behaviour ==============
+
+@pytest.fixture
+def provider(client, monkeypatch):
+    import httpx
+
+    state = {"calls": 0, "status": 200}
+
+    def handler(request):
+        state["calls"] += 1
+        if state["status"] != 200:
+            return httpx.Response(state["status"])
+        return httpx.Response(200, json={"email": "g@example.com", "name": "Google User"})
+
+    upstream = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="https://provider")
+    monkeypatch.setattr(server, "get_auth_http_client", lambda: upstream)
+    monkeypatch.setattr(server, "oauth_exchanges", server.SingleFlightCache(ttl_seconds=60, max_size=10))
+    monkeypatch.setattr(server, "oauth_breaker", server.CircuitBreaker(failure_threshold=2, reset_seconds=30))
+    return state
+
+
+def test_repeated_exchange_reuses_the_app_session(client, provider, mock_db):
+    first = client.post("/api/auth/session", json={"session_id": "sess-1"})
+    second = client.post("/api/auth/session", json={"session_id": "sess-1"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.cookies["session_token"] == second.cookies["session_token"]
+    assert provider["calls"] == 1
+    assert asyncio.run(mock_db.user_sessions.count_documents({})) == 1
+
+
+def test_open_breaker_fails_fast(client, provider):
+    provider["status"] = 502
+    for _ in range(2):
+        assert client.post("/api/auth/session", json={"session_id": "bad"}).status_code == 401
+
+    response = client.post("/api/auth/session", json={"session_id": "other"})
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert provider["calls"] == 2
@@ -0,0 +1,80 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+
+def raw_cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("sort_value", [
+    datetime(2024, 5, 1, 12, 30, 15, 123000, tzinfo=timezone.utc),
+    "2024-05-01",
+    42,
+    1.5,
+])
+def test_cursor_round_trip(sort_value):
+    cursor = server.encode_cursor(sort_value, "contact-7")
+
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor) == (sort_value, "contact-7")
+
+
+def test_naive_datetimes_decode_as_utc():
+    cursor = server.encode_cursor(datetime(2024, 5, 1, 12, 0), "id")
+
+    sort_value, _ = server.decode_cursor(cursor)
+
+    assert sort_value == datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!not-base64!!!",
+    raw_cursor("just a string")[:-2] + "@@",
+    base64.urlsafe_b64encode(b"{not json").decode(),
+    raw_cursor(["only-one"]),
+    raw_cursor(["a", "b", "c"]),
+    raw_cursor({"sort": 1, "id": 2}),
+    raw_cursor(5),
+    raw_cursor([{"$date": "not a date"}, "id"]),
+    raw_cursor([{"$ne": None}, "id"]),
+    raw_cursor(["2024-05-01", {"$gt": ""}]),
+    raw_cursor([None, "id"]),
+    raw_cursor([True, "id"]),
+], ids=[
+    "bad-base64", "bad-padding", "bad-json", "short", "long", "object", "scalar",
+    "bad-date", "operator-sort", "operator-id", "null", "bool",
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(server.HTTPException) as raised:
+        server.decode_cursor(cursor)
+
+    assert raised.value.status_code == 400
+
+
+def test_paginate_walks_every_row_once_despite_timestamp_ties(mock_db):
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rows = [{"id": f"c{i:02d}", "created_at": base + timedelta(minutes=i // 2)} for i in range(9)]
+    asyncio.run(mock_db.contact_submissions.insert_many([dict(row) for row in rows]))
+
+    async def walk(order):
+        seen, cursor = [], None
+        while True:
+            docs, cursor, total = await server.paginate(
+                mock_db.contact_submissions, {}, {"_id": 0}, "created_at", "id", 2, cursor, order,
+            )
+            seen.extend(doc["id"] for doc in docs)
+            if cursor is None:
+                return seen, total
+
+    newest_first, total = asyncio.run(walk("desc"))
+    oldest_first, _ = asyncio.run(walk("asc"))
+
+    assert total == 9
+    assert newest_first == [row["id"] for row in reversed(rows)]
+    assert oldest_first == [row["id"] for row in rows]
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+class FakeCursor:
+    def __init__(self, docs, calls):
+        self.docs = docs
+        self.calls = calls
+
+    def sort(self, keys):
+        self.calls.append(("sort", keys))
+        return self
+
+    def skip(self, offset):
+        self.calls.append(("skip", offset))
+        self.offset = offset
+        return self
+
+    def limit(self, limit):
+        self.calls.append(("limit", limit))
+        self.limit_to = limit
+        return self
+
+    async def to_list(self, length):
+        return self.docs[self.offset:self.offset + self.limit_to]
+
+
+class FakeContacts:
+    """Stands in for $text search, which mongomock does not implement."""
+
+    def __init__(self, matches):
+        self.docs = [{"id": str(i), "score": 1.0} for i in range(matches)]
+        self.calls = []
+
+    def find(self, query, projection):
+        self.calls.append(("find", query))
+        return FakeCursor(self.docs, self.calls)
+
+    async def count_documents(self, query, limit=0):
+        self.calls.append(("count_documents", limit))
+        return min(len(self.docs), limit) if limit else len(self.docs)
+
+
+@pytest.fixture
+def contacts(monkeypatch):
+    def install(matches):
+        collection = FakeContacts(matches)
+        monkeypatch.setattr(server, "reporting_db", type("Db", (), {"contact_submissions": collection})())
+        return collection
+    return install
+
+
+def search(q="hello", limit=2, cursor=None, read=None):
+    return asyncio.run(server.search_contacts(q, limit, cursor, read))
+
+
+def test_cursor_walks_pages_by_offset(contacts):
+    contacts(5)
+
+    first, cursor, _ = search()
+    second, cursor2, total = search(cursor=cursor)
+    third, cursor3, _ = search(cursor=cursor2)
+
+    assert [d["id"] for d in first + second + third] == ["0", "1", "2", "3", "4"]
+    assert cursor3 is None
+    assert total is None
+
+
+def test_short_first_page_needs_no_count(contacts):
+    collection = contacts(2)
+
+    docs, cursor, total = search(limit=5)
+
+    assert (len(docs), cursor, total) == (2, None, 2)
+    assert not any(call[0] == "count_documents" for call in collection.calls)
+
+
+def test_count_is_capped_at_the_reachable_pages(contacts, monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_MAX_OFFSET", 10)
+    collection = contacts(100)
+
+    _, _, total = search(limit=5)
+
+    assert total is None
+    assert ("count_documents", 16) in collection.calls
+
+
+def test_count_below_the_cap_is_exact(contacts, monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_MAX_OFFSET", 10)
+    contacts(8)
+
+    _, _, total = search(limit=5)
+
+    assert total == 8
+
+
+def test_read_filter_is_part_of_the_text_query(contacts):
+    collection = contacts(1)
+
+    search(read=False)
+
+    assert ("find", {"$text": {"$search": "hello"}, "read": False}) in collection.calls
+
+
+@pytest.mark.parametrize("cursor", [server.encode_cursor(5, "keyset"), server.encode_cursor(-5, "search")])
+def test_foreign_or_negative_cursors_are_rejected(contacts, cursor):
+    contacts(1)
+
+    with pytest.raises(server.HTTPException) as error:
+        search(cursor=cursor)
+
+    assert error.value.status_code == 400
+
+
+def test_too_deep_pages_are_rejected(contacts, monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_MAX_OFFSET", 10)
+    contacts(1)
+
+    with pytest.raises(server.HTTPException) as error:
+        search(cursor=server.encode_cursor(11, "search"))
+
+    assert error.value.status_code == 400
+
+
+def test_search_route_sets_page_headers(client, mock_db, contacts):
+    response = client.post("/api/auth/register", json={"email": "admin@example.com", "password": "password123", "name": "Admin"})
+    asyncio.run(mock_db.users.update_one({"user_id": response.json()["user_id"]}, {"$set": {"role": "admin"}}))
+    contacts(3)
+
+    response = client.get("/api/admin/contacts/search", params={"q": "hello", "limit": 2})
+
+    assert response.status_code == 200
+    assert [d["id"] for d in response.json()] == ["0", "1"]
+    assert response.headers["X-Total-Count"] == "3"
+    nxt = client.get("/api/admin/contacts/search", params={"q": "hello", "limit": 2, "cursor": response.headers["X-Next-Cursor"]})
+    assert [d["id"] for d in nxt.json()] == ["2"]
+    assert "X-Next-Cursor" not in nxt.headers
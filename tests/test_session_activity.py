@@ -0,0 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def admin(client, mock_db):
+    response = client.post("/api/auth/register", json={
+        "email": "admin@example.com", "password": "password123", "name": "Admin",
+    })
+    asyncio.run(mock_db.users.update_one({"user_id": response.json()["user_id"]}, {"$set": {"role": "admin"}}))
+    client.cookies.clear()
+    server.session_cache.clear()
+    return {"Authorization": f"Bearer {response.cookies['session_token']}"}
+
+
+def seed_sessions(mock_db, user_id, count, seen=True):
+    now = datetime.now(timezone.utc)
+    docs = []
+    for i in range(count):
+        doc = server.UserSession(user_id=user_id, created_at=now - timedelta(hours=i)).model_dump()
+        if seen:
+            doc["last_seen_at"] = now - timedelta(minutes=i)
+        docs.append(doc)
+    asyncio.run(mock_db.user_sessions.insert_many(docs))
+    return [doc["session_id"] for doc in docs]
+
+
+def test_user_sessions_are_sorted_and_limited_in_the_database(client, mock_db, admin):
+    never_seen = seed_sessions(mock_db, "user_x", 2, seen=False)
+    seen = seed_sessions(mock_db, "user_x", 3)
+
+    response = client.get("/api/admin/users/user_x/sessions?limit=4", headers=admin)
+
+    assert response.status_code == 200
+    assert [s["session_id"] for s in response.json()] == seen + never_seen[:1]
+    assert response.headers["X-Total-Count"] == "5"
+    assert all("session_token" not in s for s in response.json())
+
+
+def test_touches_are_coalesced_into_one_bulk_write(mock_db, monkeypatch):
+    session_ids = seed_sessions(mock_db, "user_x", 2, seen=False)
+    activity = server.SessionActivity(resolution_seconds=60)
+
+    async def scenario():
+        for _ in range(5):
+            for session_id in session_ids:
+                activity.touch("session_id", session_id)
+        first = await activity.flush()
+        # Within the resolution nothing new is queued
+        activity.touch("session_id", session_ids[0])
+        return first, await activity.flush()
+
+    assert asyncio.run(scenario()) == (2, 0)
+    seen = asyncio.run(mock_db.user_sessions.find({"last_seen_at": {"$exists": True}}).to_list(10))
+    assert len(seen) == 2
+    assert activity.stats()["flushes"] == 1
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    state = {"now": 1000.0}
+    monkeypatch.setattr(server.time, "monotonic", lambda: state["now"])
+    return state
+
+
+def user(user_id):
+    return server.User(user_id=user_id, email=f"{user_id}@example.com", name=user_id)
+
+
+def in_days(days=7):
+    return datetime.now(timezone.utc) + timedelta(days=days)
+
+
+def test_hit_returns_the_cached_user(clock):
+    cache = server.SessionCache(max_size=10, ttl_seconds=60)
+    alice = user("alice")
+    cache.set("t1", alice, in_days())
+
+    assert cache.get("t1") is alice
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = server.SessionCache(max_size=10, ttl_seconds=60)
+    cache.set("t1", user("alice"), in_days())
+
+    clock["now"] += 61
+
+    assert cache.get("t1") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entries_never_outlive_the_session(clock):
+    cache = server.SessionCache(max_size=10, ttl_seconds=60)
+    cache.set("t1", user("alice"), datetime.now(timezone.utc) + timedelta(seconds=5))
+
+    clock["now"] += 6
+
+    assert cache.get("t1") is None
+
+
+def test_expired_sessions_are_not_cached(clock):
+    cache = server.SessionCache(max_size=10, ttl_seconds=60)
+    cache.set("t1", user("alice"), datetime.now(timezone.utc) - timedelta(seconds=1))
+
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = server.SessionCache(max_size=2, ttl_seconds=60)
+    cache.set("t1", user("alice"), in_days())
+    cache.set("t2", user("bob"), in_days())
+    cache.get("t1")
+
+    cache.set("t3", user("carol"), in_days())
+
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None
+    assert cache.evictions == 1
+
+
+def test_invalidate_user_drops_all_of_their_tokens(clock):
+    cache = server.SessionCache(max_size=10, ttl_seconds=60)
+    cache.set("a1", user("alice"), in_days())
+    cache.set("a2", user("alice"), in_days())
+    cache.set("b1", user("bob"), in_days())
+
+    cache.invalidate_user("alice")
+
+    assert cache.get("a1") is None and cache.get("a2") is None
+    assert cache.get("b1") is not None
+    assert "alice" not in cache._tokens_by_user
+
+
+def test_invalidate_token_keeps_other_sessions(clock):
+    cache = server.SessionCache(max_size=10, ttl_seconds=60)
+    cache.set("a1", user("alice"), in_days())
+    cache.set("a2", user("alice"), in_days())
+
+    cache.invalidate_token("a1")
+
+    assert cache.get("a1") is None
+    assert cache.get("a2") is not None
+
+
+def test_zero_size_disables_the_cache(clock):
+    cache = server.SessionCache(max_size=0, ttl_seconds=60)
+    cache.set("t1", user("alice"), in_days())
+
+    assert cache.get("t1") is None
+
+
+def test_invalidation_reaches_other_workers_on_their_next_poll(clock, mock_db):
+    here = server.SessionCache(max_size=10, ttl_seconds=60)
+    there = server.SessionCache(max_size=10, ttl_seconds=60)
+    there.set("a1", user("alice"), in_days())
+    there.set("b1", user("bob"), in_days())
+
+    async def run():
+        await there.refresh()
+        await here.invalidate(["alice"])
+        await there.refresh()
+
+    asyncio.run(run())
+
+    assert there.get("a1") is None
+    assert there.get("b1") is not None
+
+
+def test_admin_checks_skip_the_cache(client, mock_db):
+    response = client.post("/api/auth/register", json={"email": "admin@example.com", "password": "password123", "name": "Admin"})
+    user_id = response.json()["user_id"]
+    asyncio.run(mock_db.users.update_one({"user_id": user_id}, {"$set": {"role": "admin"}}))
+    assert client.get("/api/auth/me").json()["role"] == "admin"
+    assert client.get("/api/admin/session-cache").status_code == 200
+
+    # Demoted through another worker: this worker's cache still says admin
+    asyncio.run(mock_db.users.update_one({"user_id": user_id}, {"$set": {"role": "visitor"}}))
+
+    assert client.get("/api/admin/session-cache").status_code == 403
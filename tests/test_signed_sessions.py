@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def signed(client, monkeypatch):
+    monkeypatch.setattr(server, "SESSION_SIGNING_KEY", "test-signing-key-of-at-least-32-bytes!")
+    monkeypatch.setattr(server, "session_revocations", server.SessionRevocations(enabled=True, poll_seconds=1))
+    return client
+
+
+def register(client, email):
+    response = client.post("/api/auth/register", json={"email": email, "password": "password123", "name": "Test"})
+    assert response.status_code == 200, response.text
+    return response.cookies["session_token"], response.json()["user_id"]
+
+
+def make_admin(client, mock_db, email):
+    _, user_id = register(client, email)
+    asyncio.run(mock_db.users.update_one({"user_id": user_id}, {"$set": {"role": "admin"}}))
+    # A token issued before the promotion carries the old role; log in again
+    response = client.post("/api/auth/login", json={"email": email, "password": "password123"})
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {response.cookies['session_token']}"}
+
+
+def test_signed_token_is_verified_without_a_session_read(signed, mock_db):
+    token, user_id = register(signed, "visitor@example.com")
+    signed.cookies.clear()
+    asyncio.run(mock_db.user_sessions.delete_many({}))
+
+    response = signed.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json()["user_id"] == user_id
+
+
+def test_logout_revokes_the_signed_token(signed):
+    token, _ = register(signed, "visitor@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    signed.post("/api/auth/logout")
+    signed.cookies.clear()
+
+    assert signed.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_role_change_revokes_tokens_and_removes_session_rows(signed, mock_db):
+    admin = make_admin(signed, mock_db, "admin@example.com")
+    token, user_id = register(signed, "visitor@example.com")
+    signed.cookies.clear()
+
+    response = signed.put(f"/api/admin/users/{user_id}/role", headers=admin)
+
+    assert response.status_code == 200
+    assert signed.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert asyncio.run(mock_db.user_sessions.count_documents({"user_id": user_id})) == 0
+    assert signed.get(f"/api/admin/users/{user_id}/sessions", headers=admin).json() == []
+
+
+def test_bulk_role_change_removes_session_rows(signed, mock_db):
+    admin = make_admin(signed, mock_db, "admin@example.com")
+    _, first = register(signed, "one@example.com")
+    _, second = register(signed, "two@example.com")
+    signed.cookies.clear()
+
+    response = signed.post(
+        "/api/admin/users/bulk-role", headers=admin, json={"user_ids": [first, second], "role": "admin"}
+    )
+
+    assert response.json()["affected"] == 2
+    assert asyncio.run(mock_db.user_sessions.count_documents({"user_id": {"$in": [first, second]}})) == 0
+
+
+def test_bulk_role_change_revokes_in_one_round_trip(signed, mock_db, round_trips):
+    admin = make_admin(signed, mock_db, "admin@example.com")
+    user_ids = [register(signed, f"user{i}@example.com")[1] for i in range(3)]
+    signed.cookies.clear()
+    round_trips.clear()
+
+    response = signed.post("/api/admin/users/bulk-role", headers=admin, json={"user_ids": user_ids, "role": "admin"})
+
+    assert response.json()["affected"] == 3
+    assert round_trips.count(("session_revocations", "bulk_write")) == 1
+    assert not any(op == "update_one" for name, op in round_trips if name == "session_revocations")
+    assert asyncio.run(mock_db.session_revocations.count_documents({"kind": "user", "key": {"$in": user_ids}})) == 3
@@ -0,0 +1,202 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+import server
+
+
+class FlakyCollection:
+    """insert_many fails with the queued errors (None: succeed), then stores documents."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.docs = []
+        self.calls = 0
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls += 1
+        await asyncio.sleep(0)
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            if isinstance(error, BulkWriteError):
+                self.docs.extend(doc for i, doc in enumerate(docs) if i not in error.failed_indexes)
+            raise error
+        self.docs.extend(docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+def bulk_error(codes_by_index):
+    error = BulkWriteError({
+        "nInserted": 0,
+        "writeErrors": [{"index": i, "code": code, "errmsg": f"code {code}"} for i, code in codes_by_index.items()],
+    })
+    error.failed_indexes = set(codes_by_index)
+    return error
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FlakyCollection()
+    monkeypatch.setattr(server, "db", {"contact_submissions": collection})
+    bumps = []
+
+    async def bump(name):
+        bumps.append(name)
+
+    monkeypatch.setattr(server.change_versions, "bump", bump)
+    collection.bumps = bumps
+    return collection
+
+
+def make_buffer(mode="buffered", **kwargs):
+    options = {"max_batch": 10, "flush_interval_seconds": 0.01, "max_retries": 2}
+    options.update(kwargs)
+    return server.WriteBehindBuffer("contact_submissions", mode, **options)
+
+
+def test_failed_batch_is_kept_and_retried_after_backoff(collection):
+    collection.errors = [AutoReconnect("primary stepped down")]
+    buffer = make_buffer()
+
+    async def scenario():
+        for i in range(3):
+            await buffer.insert({"id": i})
+        assert await buffer.flush() == 0
+        assert len(buffer._pending) == 3
+        # Still inside the backoff window: nothing is attempted
+        assert await buffer.flush() == 0
+        assert collection.calls == 1
+        await asyncio.sleep(0.05)
+        return await buffer.flush()
+
+    assert asyncio.run(scenario()) == 3
+    assert [doc["id"] for doc in collection.docs] == [0, 1, 2]
+    assert buffer.failed == 0
+    assert buffer.retries == 1
+    assert collection.bumps == ["contact_submissions"]
+
+
+def test_batch_is_dropped_after_max_retries(collection):
+    collection.errors = [AutoReconnect("down")] * 3
+    buffer = make_buffer(max_retries=2, flush_interval_seconds=0)
+
+    async def scenario():
+        await buffer.insert({"id": 1})
+        for _ in range(3):
+            await buffer.flush()
+
+    asyncio.run(scenario())
+    assert buffer.failed == 1
+    assert buffer._pending == []
+    assert collection.docs == []
+
+
+def test_partial_bulk_write_counts_only_rejected_documents(collection):
+    # Index 0 was already written by an earlier attempt, index 1 is invalid
+    collection.errors = [bulk_error({0: 11000, 1: 121})]
+    buffer = make_buffer()
+
+    async def scenario():
+        for i in range(3):
+            await buffer.insert({"id": i})
+        return await buffer.flush()
+
+    assert asyncio.run(scenario()) == 2
+    assert buffer.failed == 1
+    assert buffer.documents == 2
+    assert buffer._pending == []
+    assert collection.bumps == ["contact_submissions"]
+
+
+def test_full_backlog_writes_through(collection):
+    collection.errors = [AutoReconnect("down")]
+    buffer = make_buffer(max_batch=2, max_pending=2, flush_interval_seconds=10)
+
+    async def scenario():
+        await buffer.insert({"id": 1})
+        await buffer.insert({"id": 2})  # triggers the failing flush
+        await buffer.insert({"id": 3})
+
+    asyncio.run(scenario())
+    assert [doc["id"] for doc in collection.docs] == [3]
+    assert len(buffer._pending) == 2
+
+
+def test_shutdown_flush_ignores_backoff(collection):
+    collection.errors = [AutoReconnect("down")]
+    buffer = make_buffer(flush_interval_seconds=10)
+
+    async def scenario():
+        await buffer.insert({"id": 1})
+        await buffer.flush()
+        await buffer.stop()
+
+    asyncio.run(scenario())
+    assert [doc["id"] for doc in collection.docs] == [1]
+
+
+def test_ack_mode_shares_one_insert_many_between_concurrent_callers(collection):
+    buffer = make_buffer("ack")
+
+    async def scenario():
+        await asyncio.gather(*(buffer.insert({"id": i}) for i in range(5)))
+
+    asyncio.run(scenario())
+    # The first caller writes alone; the four queued behind it share a batch
+    assert collection.calls == 2
+    assert sorted(doc["id"] for doc in collection.docs) == [0, 1, 2, 3, 4]
+    assert buffer._pending == []
+    assert collection.bumps == ["contact_submissions"] * 2
+
+
+def test_ack_mode_raises_write_errors_to_the_caller(collection):
+    collection.errors = [AutoReconnect("down")]
+    buffer = make_buffer("ack")
+
+    with pytest.raises(AutoReconnect):
+        asyncio.run(buffer.insert({"id": 1}))
+    assert buffer._pending == []
+    assert buffer.failed == 1
+    assert collection.bumps == []
+
+
+def test_ack_mode_fails_only_rejected_documents(collection):
+    collection.errors = [None, bulk_error({0: 121})]
+    buffer = make_buffer("ack")
+
+    async def scenario():
+        return await asyncio.gather(*(buffer.insert({"id": i}) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    # The first call writes alone; ids 1 and 2 share a batch that rejects id 1
+    assert isinstance(results[1], BulkWriteError)
+    assert results[0] is None and results[2] is None
+    assert sorted(doc["id"] for doc in collection.docs) == [0, 2]
+
+
+def test_written_hook_runs_after_the_flush_not_the_insert(collection):
+    written = []
+    buffer = make_buffer(on_written=written.extend)
+
+    async def scenario():
+        await buffer.insert({"id": 1})
+        assert written == [] and collection.bumps == []
+        await buffer.flush()
+
+    asyncio.run(scenario())
+    assert written == [{"id": 1}]
+    assert collection.bumps == ["contact_submissions"]
+
+
+def test_write_through_bumps_and_runs_the_written_hook(collection):
+    written = []
+    buffer = make_buffer(max_batch=1, max_pending=1, on_written=written.extend)
+    buffer._pending.append(({"id": 0}, None))
+
+    asyncio.run(buffer.insert({"id": 1}))
+
+    assert written == [{"id": 1}]
+    assert collection.bumps == ["contact_submissions"]